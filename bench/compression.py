@@ -0,0 +1,81 @@
+"""Compression ratio against CPU cost of CompressedSerializer, for a large
+checkpoint of chat messages, and for small ones with and without a zlib
+dictionary trained on earlier messages.
+
+    python -m bench.compression
+"""
+import time
+from typing import Any, Callable
+
+from langgraph.checkpoint.base import Checkpoint, empty_checkpoint
+from langgraph.checkpoint.serde import (
+    CompressedSerializer,
+    PickleSerializer,
+    SerializerProtocol,
+    train_zdict,
+)
+
+ROUNDS = 20
+
+
+def message(i: int) -> dict[str, Any]:
+    return {
+        "role": "assistant" if i % 2 else "user",
+        "content": f"Turn {i}. Sure, here is the summary of the document you "
+        "asked about, with the key points listed below for your review: "
+        f"point {i % 7}, point {i % 11} and point {i % 13}.",
+        "metadata": {"model": "chat-model", "tokens": 40 + i % 30},
+    }
+
+
+def make_checkpoint(messages: list[dict[str, Any]]) -> Checkpoint:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": messages, "step": len(messages)}
+    checkpoint["channel_versions"].update(messages=1, step=1)
+    return checkpoint
+
+
+def per_call(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def report(case: str, serializers: dict[str, SerializerProtocol], obj: Any) -> None:
+    baseline = len(PickleSerializer().dumps(obj))
+    for name, serde in serializers.items():
+        data = serde.dumps(obj)
+        dumps = per_call(lambda: serde.dumps(obj))
+        loads = per_call(lambda: serde.loads(data))
+        print(
+            f"{case:>14} {name:>12} {len(data):>9} {baseline / len(data):>6.1f}x"
+            f" {dumps:>10.3f} {loads:>10.3f}"
+        )
+
+
+def main() -> None:
+    print(
+        f"{'case':>14} {'serde':>12} {'bytes':>9} {'ratio':>7}"
+        f" {'dumps (ms)':>10} {'loads (ms)':>10}"
+    )
+    large: dict[str, SerializerProtocol] = {"none": PickleSerializer()}
+    for level in (1, 6, 9):
+        large[f"zlib-{level}"] = CompressedSerializer(level=level)
+    for preset in (0, 6):
+        large[f"lzma-{preset}"] = CompressedSerializer(method="lzma", level=preset)
+    report("2k messages", large, make_checkpoint([message(i) for i in range(2_000)]))
+
+    zdict = train_zdict([message(i) for i in range(200)])
+    small: dict[str, SerializerProtocol] = {
+        "none": PickleSerializer(),
+        "zlib-6": CompressedSerializer(threshold=0),
+        "zlib-6+dict": CompressedSerializer(threshold=0, zdict=zdict),
+    }
+    report(
+        "3 messages", small, make_checkpoint([message(i) for i in range(1_000, 1_003)])
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Invocations per second of a small graph, with and without a shared executor.
+
+    python -m bench.executor
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langgraph.pregel import Channel, Pregel
+from langgraph.pregel.executor import PregelExecutor
+
+DURATION = 2.0
+
+
+def add_one(x: int) -> int:
+    return x + 1
+
+
+def make_app(executor: Optional[PregelExecutor]) -> Pregel:
+    return Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input") | add_one | Channel.write_to("a"),
+            "two": Channel.subscribe_to("a") | add_one | Channel.write_to("b"),
+            "three": Channel.subscribe_to("a") | add_one | Channel.write_to("c"),
+            "four": Channel.subscribe_to(["b", "c"])
+            | (lambda x: x["b"] + x["c"])
+            | Channel.write_to("output"),
+        },
+        executor=executor,
+    )
+
+
+def invocations_per_second(app: Pregel, clients: int) -> float:
+    deadline = time.perf_counter() + DURATION
+
+    def client() -> int:
+        count = 0
+        while time.perf_counter() < deadline:
+            app.invoke(1)
+            count += 1
+        return count
+
+    with ThreadPoolExecutor(clients) as pool:
+        total = sum(pool.map(lambda _: client(), range(clients)))
+    return total / DURATION
+
+
+def main() -> None:
+    print(f"{'clients':>8} {'per-call pool (inv/s)':>22} {'shared pool (inv/s)':>20}")
+    for clients in (1, 4, 16):
+        per_call = invocations_per_second(make_app(None), clients)
+        with PregelExecutor(max_concurrency=32) as executor:
+            shared = invocations_per_second(make_app(executor), clients)
+        print(f"{clients:>8} {per_call:>22.0f} {shared:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
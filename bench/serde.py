@@ -0,0 +1,88 @@
+"""Encode and decode speed, and encoded size, of PickleSerializer against JSON,
+for checkpoints of chat messages, large bytes and, if numpy is installed, arrays.
+
+    python -m bench.serde
+"""
+import base64
+import json
+import time
+from typing import Any, Callable
+
+from langgraph.checkpoint.base import Checkpoint, empty_checkpoint
+from langgraph.checkpoint.serde import PickleSerializer, SerializerProtocol
+
+ROUNDS = 20
+
+
+class JsonSerializer:
+    """JSON, with sets as lists and bytes as base64. Unlike pickle, it can't
+    restore sets, tuples and defaultdicts, so loaded checkpoints differ."""
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, (set, tuple)):
+            return list(obj)
+        if isinstance(obj, (bytes, bytearray)):
+            return base64.b64encode(obj).decode()
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        raise TypeError(f"Can't encode {type(obj).__name__}")
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=self._default).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+def make_checkpoint(values: dict[str, Any]) -> Checkpoint:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = values
+    for chan in values:
+        checkpoint["channel_versions"][chan] = 1
+        checkpoint["versions_seen"]["node"][chan] = 1
+    return checkpoint
+
+
+def cases() -> dict[str, Checkpoint]:
+    messages = [
+        {"role": "user", "content": f"message {i} " + "x" * 200} for i in range(1_000)
+    ]
+    topic = (set(range(1_000)), list(range(1_000)))
+    result = {
+        "1k messages": make_checkpoint({"messages": messages, "topic": topic}),
+        "10MB bytes": make_checkpoint({"blob": bytes(10_000_000)}),
+    }
+    try:
+        import numpy as np
+
+        result["10MB array"] = make_checkpoint({"array": np.zeros(1_250_000)})
+    except ImportError:
+        pass
+    return result
+
+
+def per_call(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main() -> None:
+    serializers: dict[str, SerializerProtocol] = {
+        "pickle": PickleSerializer(),
+        "json": JsonSerializer(),
+    }
+    print(
+        f"{'case':>12} {'serde':>7} {'dumps (ms)':>11} {'loads (ms)':>11} {'size':>10}"
+    )
+    for case, checkpoint in cases().items():
+        for name, serde in serializers.items():
+            data = serde.dumps(checkpoint)
+            dumps = per_call(lambda: serde.dumps(checkpoint))
+            loads = per_call(lambda: serde.loads(data))
+            print(f"{case:>12} {name:>7} {dumps:>11.2f} {loads:>11.2f} {len(data):>10}")
+
+
+if __name__ == "__main__":
+    main()
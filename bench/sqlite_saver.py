@@ -0,0 +1,58 @@
+"""Checkpoints saved per second by SqliteSaver, at several checkpoint sizes,
+with one or more threads saving at once.
+
+    python -m bench.sqlite_saver
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.runnables import RunnableConfig
+
+from langgraph.checkpoint.base import Checkpoint, empty_checkpoint
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+DURATION = 2.0
+
+
+def make_checkpoint(size: int) -> Checkpoint:
+    checkpoint = empty_checkpoint()
+    # distinct strings, as pickle would store a repeated one only once
+    checkpoint["channel_values"]["messages"] = [
+        f"{i:0100d}" for i in range(size // 100)
+    ]
+    checkpoint["channel_versions"]["messages"] = 1
+    return checkpoint
+
+
+def puts_per_second(saver: SqliteSaver, checkpoint: Checkpoint, clients: int) -> float:
+    deadline = time.perf_counter() + DURATION
+
+    def client(n: int) -> int:
+        config: RunnableConfig = {"configurable": {"thread_id": str(n)}}
+        count = 0
+        while time.perf_counter() < deadline:
+            saver.put(config, checkpoint)
+            count += 1
+        return count
+
+    with ThreadPoolExecutor(clients) as pool:
+        total = sum(pool.map(client, range(clients)))
+    return total / DURATION
+
+
+def main() -> None:
+    print(f"{'size':>10} {'clients':>8} {'puts/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (1_000, 10_000, 100_000, 1_000_000):
+            checkpoint = make_checkpoint(size)
+            for clients in (1, 8):
+                path = os.path.join(tmp, f"{size}-{clients}.db")
+                with SqliteSaver(path=path) as saver:
+                    rate = puts_per_second(saver, checkpoint, clients)
+                print(f"{size:>10} {clients:>8} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from typing import (
     AsyncGenerator,
     Generator,
     Generic,
+    Iterable,
     Mapping,
     Optional,
     Sequence,
@@ -14,7 +15,7 @@ from typing import (
 
 from typing_extensions import Self
 
-from langgraph.checkpoint.base import Checkpoint
+from langgraph.checkpoint.base import Checkpoint, copy_checkpoint
 
 Value = TypeVar("Value")
 Update = TypeVar("Update")
@@ -45,6 +46,20 @@ class BaseChannel(Generic[Value, Update, C], ABC):
     def UpdateType(self) -> Any:
         """The type of the update received by the channel."""
 
+    @property
+    def notify_on_step(self) -> bool:
+        """Whether the channel must be notified, with an empty update, of each step
+        in which it wasn't updated. Channels whose value doesn't depend on step
+        boundaries can return False to skip these notifications."""
+        return True
+
+    @property
+    def merges_writes(self) -> bool:
+        """Whether writes from different tasks can be applied to the channel one at
+        a time, with the same result as if applied together at the end of a step.
+        Used to decide whether the relaxed barrier mode is safe for a graph."""
+        return False
+
     @contextmanager
     @abstractmethod
     def empty(self, checkpoint: Optional[C] = None) -> Generator[Self, None, None]:
@@ -74,6 +89,8 @@ class BaseChannel(Generic[Value, Update, C], ABC):
     @abstractmethod
     def checkpoint(self) -> Optional[C]:
         """Return a string representation of the channel's current state.
+        It must not change as the channel is updated afterwards, eg. by copying
+        what the channel would otherwise change in place, the next time it does.
 
         Raises EmptyChannelError if the channel is empty (never updated yet),
         or doesn't supportcheckpoints."""
@@ -115,17 +132,36 @@ async def AsyncChannelsManager(
 def create_checkpoint(
     checkpoint: Checkpoint, channels: Mapping[str, BaseChannel]
 ) -> Checkpoint:
-    """Create a checkpoint for the given channels."""
-    checkpoint = Checkpoint(
-        v=1,
-        ts=datetime.now(timezone.utc).isoformat(),
-        channel_values=checkpoint["channel_values"],
-        channel_versions=checkpoint["channel_versions"],
-        versions_seen=checkpoint["versions_seen"],
-    )
+    """Create a checkpoint for the given channels. It shares no state that is
+    updated afterwards with the channels, nor with the checkpoint passed in, so
+    it can be saved as is, without copying channel values."""
+    checkpoint = copy_checkpoint(checkpoint)
+    checkpoint["ts"] = datetime.now(timezone.utc).isoformat()
     for k, v in channels.items():
         try:
             checkpoint["channel_values"][k] = v.checkpoint()
         except EmptyChannelError:
             pass
     return checkpoint
+
+
+def create_delta(
+    checkpoint: Checkpoint, channels: Mapping[str, BaseChannel], changed: Iterable[str]
+) -> Checkpoint:
+    """Create a delta checkpoint, with the values of only the changed channels, to
+    be applied to the previous checkpoint with apply_delta()."""
+    delta = copy_checkpoint(
+        Checkpoint(
+            v=1,
+            ts=datetime.now(timezone.utc).isoformat(),
+            channel_values={},
+            channel_versions=checkpoint["channel_versions"],
+            versions_seen=checkpoint["versions_seen"],
+        )
+    )
+    for k in changed:
+        try:
+            delta["channel_values"][k] = channels[k].checkpoint()
+        except EmptyChannelError:
+            pass
+    return delta
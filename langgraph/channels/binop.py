@@ -34,6 +34,16 @@ class BinaryOperatorAggregate(Generic[Value], BaseChannel[Value, Value, Value]):
         """The type of the update received by the channel."""
         return self.typ
 
+    @property
+    def notify_on_step(self) -> bool:
+        """The aggregate only changes when new values are received."""
+        return False
+
+    @property
+    def merges_writes(self) -> bool:
+        """Writes are folded into the aggregate whenever they are received."""
+        return True
+
     @contextmanager
     def empty(self, checkpoint: Optional[Value] = None) -> Generator[Self, None, None]:
         empty = self.__class__(self.typ, self.operator)
@@ -65,6 +65,11 @@ class Context(Generic[Value], BaseChannel[Value, None, None]):
         """The type of the update received by the channel."""
         raise InvalidUpdateError()
 
+    @property
+    def notify_on_step(self) -> bool:
+        """The value is fixed for the duration of the invocation."""
+        return False
+
     @contextmanager
     def empty(self, checkpoint: None = None) -> Generator[Self, None, None]:
         if self.ctx is None:
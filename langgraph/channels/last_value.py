@@ -27,6 +27,11 @@ class LastValue(Generic[Value], BaseChannel[Value, Value, Value]):
         """The type of the update received by the channel."""
         return self.typ
 
+    @property
+    def notify_on_step(self) -> bool:
+        """Keeps its value until the next write."""
+        return False
+
     @contextmanager
     def empty(self, checkpoint: Optional[Value] = None) -> Generator[Self, None, None]:
         empty = self.__class__(self.typ)
@@ -38,6 +38,9 @@ class Topic(
         # state
         self.seen = set[Value]()
         self.values = list[Value]()
+        # whether seen and values are shared with a checkpoint, in which case
+        # they're copied before being changed
+        self.shared = False
 
     @property
     def ValueType(self) -> Any:
@@ -49,14 +52,24 @@ class Topic(
         """The type of the update received by the channel."""
         return Union[self.typ, list[self.typ]]  # type: ignore[name-defined]
 
+    @property
+    def notify_on_step(self) -> bool:
+        """Non-accumulating topics are emptied at the start of each step."""
+        return not self.accumulate
+
+    @property
+    def merges_writes(self) -> bool:
+        """Accumulating topics keep all values, however they are grouped."""
+        return self.accumulate
+
     @contextmanager
     def empty(
         self, checkpoint: Optional[tuple[set[Value], list[Value]]] = None
     ) -> Generator[Self, None, None]:
         empty = self.__class__(self.typ, self.unique, self.accumulate)
         if checkpoint is not None:
-            empty.seen = checkpoint[0]
-            empty.values = checkpoint[1]
+            empty.seen, empty.values = checkpoint
+            empty.shared = True
         try:
             yield empty
         finally:
@@ -65,6 +78,14 @@ class Topic(
     def update(self, values: Sequence[Union[Value, list[Value]]]) -> None:
         if not self.accumulate:
             self.values = list[Value]()
+        if not values:
+            return
+        if self.shared:
+            if self.accumulate:
+                self.values = list(self.values)
+            if self.unique:
+                self.seen = set(self.seen)
+            self.shared = False
         if flat_values := flatten(values):
             if self.unique:
                 for value in flat_values:
@@ -78,4 +99,5 @@ class Topic(
         return list(self.values)
 
     def checkpoint(self) -> tuple[set[Value], list[Value]]:
+        self.shared = True
         return (self.seen, self.values)
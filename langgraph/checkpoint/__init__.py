@@ -1,8 +1,11 @@
-from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointAt
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointAt, IOStats
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 
 __all__ = [
     "CheckpointAt",
     "BaseCheckpointSaver",
+    "IOStats",
     "MemorySaver",
+    "SqliteSaver",
 ]
@@ -0,0 +1,155 @@
+import asyncio
+import queue
+import threading
+from types import TracebackType
+from typing import Awaitable, Callable, Optional, Type
+
+from langchain_core.runnables import RunnableConfig
+from typing_extensions import Self
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    Checkpoint,
+    apply_delta,
+    empty_checkpoint,
+    latest,
+)
+
+
+def _rebuild(
+    saver: BaseCheckpointSaver, config: RunnableConfig, delta: Checkpoint
+) -> Callable[[], Checkpoint]:
+    # by the time the saver asks for the full checkpoint the channels have moved
+    # on, so rebuild it from the previous one, which has been saved already
+    return lambda: apply_delta(saver.get(latest(config)) or empty_checkpoint(), delta)
+
+
+class CheckpointWriter:
+    """Saves checkpoints in a background thread, in the order they're put, so that
+    the next step can start while the previous checkpoint is being saved.
+
+    put() blocks while max_pending checkpoints are waiting to be saved, and raises
+    the error of a previous save, if any, after which nothing else is saved.
+    Checkpoints put must not change afterwards, as from create_checkpoint()."""
+
+    def __init__(self, saver: BaseCheckpointSaver, max_pending: int) -> None:
+        self.saver = saver
+        self.queue: queue.Queue[Optional[Callable[[], None]]] = queue.Queue(max_pending)
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(
+            target=self._run, name="checkpoint-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            save = self.queue.get()
+            try:
+                if save is None:
+                    return
+                if self.error is None:
+                    save()
+            except Exception as exc:
+                self.error = exc
+            finally:
+                self.queue.task_done()
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        self.check()
+        self.queue.put(lambda: self.saver.put(config, checkpoint))
+
+    def put_delta(self, config: RunnableConfig, delta: Checkpoint) -> None:
+        self.check()
+        self.queue.put(
+            lambda: self.saver.put_delta(
+                config, delta, _rebuild(self.saver, config, delta)
+            )
+        )
+
+    def check(self) -> None:
+        """Raise the error of a previous save, if any."""
+        if self.error is not None:
+            raise self.error
+
+    def flush(self) -> None:
+        """Wait for all checkpoints put so far to be saved."""
+        self.queue.join()
+        self.check()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        # checkpoints already put are still saved, eg. if a later step failed
+        self.queue.put(None)
+        self.thread.join()
+
+
+class AsyncCheckpointWriter:
+    """Saves checkpoints in a background task, in the order they're put, so that
+    the next step can start while the previous checkpoint is being saved.
+
+    put() waits while max_pending checkpoints are waiting to be saved, and raises
+    the error of a previous save, if any, after which nothing else is saved.
+    Checkpoints put must not change afterwards, as from create_checkpoint()."""
+
+    def __init__(self, saver: BaseCheckpointSaver, max_pending: int) -> None:
+        self.saver = saver
+        self.queue: asyncio.Queue[
+            Optional[Callable[[], Awaitable[None]]]
+        ] = asyncio.Queue(max_pending)
+        self.error: Optional[BaseException] = None
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            save = await self.queue.get()
+            try:
+                if save is None:
+                    return
+                if self.error is None:
+                    await save()
+            except Exception as exc:
+                self.error = exc
+            finally:
+                self.queue.task_done()
+
+    async def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        self.check()
+        await self.queue.put(lambda: self.saver.aput(config, checkpoint))
+
+    async def put_delta(self, config: RunnableConfig, delta: Checkpoint) -> None:
+        self.check()
+        await self.queue.put(
+            lambda: self.saver.aput_delta(
+                config, delta, _rebuild(self.saver, config, delta)
+            )
+        )
+
+    def check(self) -> None:
+        """Raise the error of a previous save, if any."""
+        if self.error is not None:
+            raise self.error
+
+    async def flush(self) -> None:
+        """Wait for all checkpoints put so far to be saved."""
+        await self.queue.join()
+        self.check()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        # checkpoints already put are still saved, eg. if a later step failed
+        await self.queue.put(None)
+        await self.task
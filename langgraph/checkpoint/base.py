@@ -1,13 +1,27 @@
 import asyncio
+import threading
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Optional, TypedDict
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypedDict,
+    TypeVar,
+)
 
 from langchain_core.load.serializable import Serializable
+from langchain_core.pydantic_v1 import Field, PrivateAttr
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.utils import ConfigurableFieldSpec
 
+from langgraph.checkpoint.serde import PickleSerializer, SerializerProtocol
 from langgraph.utils import StrEnum
 
 
@@ -25,34 +39,204 @@ def empty_checkpoint() -> Checkpoint:
         ts=datetime.now(timezone.utc).isoformat(),
         channel_values={},
         channel_versions=defaultdict(int),
-        versions_seen=defaultdict(lambda: defaultdict(int)),
+        # a partial rather than a lambda, so that checkpoints can be pickled
+        versions_seen=defaultdict(partial(defaultdict, int)),
     )
 
 
+def copy_checkpoint(checkpoint: Checkpoint) -> Checkpoint:
+    """Copy a checkpoint, so that later updates to the original, eg. to its channel
+    versions, don't affect the copy. Channel values themselves aren't copied."""
+    return Checkpoint(
+        v=checkpoint["v"],
+        ts=checkpoint["ts"],
+        channel_values=checkpoint["channel_values"].copy(),
+        channel_versions=checkpoint["channel_versions"].copy(),
+        versions_seen=defaultdict(
+            checkpoint["versions_seen"].default_factory,
+            {k: v.copy() for k, v in checkpoint["versions_seen"].items()},
+        ),
+    )
+
+
+def apply_delta(checkpoint: Checkpoint, delta: Checkpoint) -> Checkpoint:
+    """Apply a delta checkpoint, which only has the values of the channels updated
+    since the checkpoint it's based on, to that checkpoint."""
+    return Checkpoint(
+        v=delta["v"],
+        ts=delta["ts"],
+        channel_values={**checkpoint["channel_values"], **delta["channel_values"]},
+        channel_versions=delta["channel_versions"],
+        versions_seen=delta["versions_seen"],
+    )
+
+
+def latest(config: RunnableConfig) -> RunnableConfig:
+    """Config to get the latest checkpoint of the thread in config, whatever its
+    thread_ts."""
+    if not config["configurable"].get("thread_ts"):
+        return config
+    return {**config, "configurable": {**config["configurable"], "thread_ts": None}}
+
+
+T = TypeVar("T")
+
+
+class IOStats(NamedTuple):
+    """Calls of a saver's sync methods run by its async ones, in its I/O threads."""
+
+    queued: int
+    """Calls waiting for a thread."""
+
+    running: int
+    """Calls running."""
+
+    completed: int
+    """Calls finished, including those that raised."""
+
+    max_queued: int
+    """Most calls waiting at once so far."""
+
+
 class CheckpointAt(StrEnum):
     END_OF_STEP = "end_of_step"
     END_OF_RUN = "end_of_run"
 
 
 class BaseCheckpointSaver(Serializable, ABC):
+    """Saves checkpoints of threads, and loads them back.
+
+    The async methods run the sync ones in the saver's own threads, at most
+    max_io_workers at once, rather than in the event loop's default executor,
+    so that checkpoint I/O and the rest of the app don't hold up each other.
+    Savers with an async client override them instead, and then the sync ones
+    are only called by sync runs."""
+
     at: CheckpointAt = CheckpointAt.END_OF_RUN
 
+    snapshot_interval: int = 1
+    """Save a full checkpoint every snapshot_interval saves of the same thread, and
+    in between only deltas, with the channels updated since the previous save.
+    The default of 1 always saves full checkpoints. Savers must override
+    put_delta() to store deltas, otherwise full checkpoints are saved."""
+
+    serde: SerializerProtocol = Field(default_factory=PickleSerializer)
+    """Encodes checkpoints to bytes, for savers that store bytes."""
+
+    max_history: int = 1
+    """Number of checkpoints to keep for each thread, including the latest, pruning
+    older ones. Pass the ts of an earlier one as thread_ts in config to get() it,
+    eg. to resume or fork the thread from it. Savers must override history() to
+    keep more than the latest."""
+
+    max_io_workers: int = 4
+    """Number of threads the async methods run the sync ones in. Calls beyond that
+    wait for one, as counted by io_stats."""
+
+    _io: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _io_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _io_queued: int = PrivateAttr(default=0)
+    _io_running: int = PrivateAttr(default=0)
+    _io_completed: int = PrivateAttr(default=0)
+    _io_max_queued: int = PrivateAttr(default=0)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def io_stats(self) -> IOStats:
+        """Calls run in the saver's I/O threads, eg. to tell if there are too few."""
+        with self._io_lock:
+            return IOStats(
+                self._io_queued,
+                self._io_running,
+                self._io_completed,
+                self._io_max_queued,
+            )
+
+    def _submit_io(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        def run() -> T:
+            with self._io_lock:
+                self._io_queued -= 1
+                self._io_running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._io_lock:
+                    self._io_running -= 1
+                    self._io_completed += 1
+
+        def done(fut: "Future[T]") -> None:
+            if fut.cancelled():
+                with self._io_lock:
+                    self._io_queued -= 1
+
+        with self._io_lock:
+            if self._io is None:
+                self._io = ThreadPoolExecutor(
+                    self.max_io_workers, thread_name_prefix="checkpoint-io"
+                )
+            self._io_queued += 1
+            self._io_max_queued = max(self._io_max_queued, self._io_queued)
+            fut = self._io.submit(run)
+        fut.add_done_callback(done)
+        return fut
+
+    async def _run_io(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn in the saver's I/O threads."""
+        return await asyncio.wrap_future(self._submit_io(fn, *args))
+
+    def close(self) -> None:
+        """Wait for the calls running in the saver's I/O threads, and stop them.
+        The saver can still be used afterwards, starting them again."""
+        with self._io_lock:
+            io, self._io = self._io, None
+        if io is not None:
+            io.shutdown()
+
     @property
     def config_specs(self) -> list[ConfigurableFieldSpec]:
         return []
 
     @abstractmethod
     def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
-        ...
+        """Return the checkpoint with the thread_ts in config, if any, otherwise
+        the latest one."""
+
+    def history(self, config: RunnableConfig) -> Iterator[Checkpoint]:
+        """Return the checkpoints kept for the thread in config, newest first."""
+        if (checkpoint := self.get(latest(config))) is not None:
+            yield checkpoint
 
     @abstractmethod
     def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
         ...
 
+    def put_delta(
+        self,
+        config: RunnableConfig,
+        delta: Checkpoint,
+        full: Callable[[], Checkpoint],
+    ) -> None:
+        """Save a delta checkpoint, based on the latest checkpoint for the config.
+        Call full() to create the full checkpoint instead, eg. when a snapshot is
+        due. get() must return the full checkpoint, with deltas applied."""
+        self.put(config, full())
+
     async def aget(self, config: RunnableConfig) -> Optional[Checkpoint]:
-        return await asyncio.get_running_loop().run_in_executor(None, self.get, config)
+        return await self._run_io(self.get, config)
+
+    async def ahistory(self, config: RunnableConfig) -> AsyncIterator[Checkpoint]:
+        for checkpoint in await self._run_io(lambda: list(self.history(config))):
+            yield checkpoint
 
     async def aput(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
-        return await asyncio.get_running_loop().run_in_executor(
-            None, self.put, config, checkpoint
-        )
+        return await self._run_io(self.put, config, checkpoint)
+
+    async def aput_delta(
+        self,
+        config: RunnableConfig,
+        delta: Checkpoint,
+        full: Callable[[], Checkpoint],
+    ) -> None:
+        return await self._run_io(self.put_delta, config, delta, full)
@@ -1,14 +1,63 @@
-from typing import Optional
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
 
-from langchain_core.pydantic_v1 import Field
+from langchain_core.pydantic_v1 import Field, PrivateAttr
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.utils import ConfigurableFieldSpec
 
-from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, apply_delta
 
 
 class MemorySaver(BaseCheckpointSaver):
-    storage: dict[str, Checkpoint] = Field(default_factory=dict)
+    """Keeps checkpoints in memory, by default the latest of every thread, forever.
+
+    Set max_history to keep earlier checkpoints of each thread too. Those share
+    the values of channels unchanged between them, unless serialize is set.
+    Set max_entries, max_bytes or ttl to bound it, evicting the checkpoints of
+    the least recently used threads, and spill to save those to another saver,
+    which makes this a cache in front of it. The hits, misses and evictions
+    properties count what happened since it was created."""
+
+    storage: dict[str, Any] = Field(default_factory=dict)
+    """Latest full checkpoint of each thread, least recently used first."""
+
+    deltas: dict[str, list[Any]] = Field(default_factory=dict)
+    """Deltas saved for each thread since its latest full checkpoint."""
+
+    past: dict[str, list[tuple[str, Any]]] = Field(default_factory=dict)
+    """Earlier full checkpoints of each thread, with their ts, oldest first."""
+
+    serialize: bool = False
+    """Store checkpoints encoded with serde, eg. to compress them with a
+    CompressedSerializer, rather than as they are."""
+
+    max_entries: Optional[int] = None
+    """Maximum number of threads to keep the checkpoints of."""
+
+    max_bytes: Optional[int] = None
+    """Maximum size of the checkpoints kept, approximated by their size encoded
+    with serde. Unless serialize is set, each save encodes them to measure them.
+    The checkpoint just saved is kept, even if it's larger."""
+
+    ttl: Optional[float] = None
+    """Seconds after which the checkpoints of a thread not saved nor loaded since
+    are evicted."""
+
+    spill: Optional[BaseCheckpointSaver] = None
+    """Saver to save evicted checkpoints to, and to load checkpoints not kept from,
+    oldest first if there are earlier ones. It's called while holding this saver's
+    lock, so that it's never behind."""
+
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    _used_at: dict[str, float] = PrivateAttr(default_factory=dict)
+    _ts: dict[str, str] = PrivateAttr(default_factory=dict)
+    _sizes: dict[str, int] = PrivateAttr(default_factory=dict)
+    _past_sizes: dict[str, list[int]] = PrivateAttr(default_factory=dict)
+    _bytes: int = PrivateAttr(default=0)
+    _hits: int = PrivateAttr(default=0)
+    _misses: int = PrivateAttr(default=0)
+    _evictions: int = PrivateAttr(default=0)
 
     @property
     def config_specs(self) -> list[ConfigurableFieldSpec]:
@@ -21,10 +70,212 @@ class MemorySaver(BaseCheckpointSaver):
                 default="",
                 is_shared=True,
             ),
+            ConfigurableFieldSpec(
+                id="thread_ts",
+                annotation=Optional[str],
+                name="Thread Timestamp",
+                description="ts of the checkpoint to start from, if not the latest.",
+                default=None,
+                is_shared=True,
+            ),
         ]
 
+    @property
+    def hits(self) -> int:
+        """Number of get() calls that found the checkpoint in memory."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Number of get() calls that didn't, whether or not spill had it."""
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """Number of threads whose checkpoints were evicted, or expired."""
+        return self._evictions
+
+    def _dump(self, checkpoint: Checkpoint) -> Any:
+        return self.serde.dumps(checkpoint) if self.serialize else checkpoint
+
+    def _load(self, stored: Any) -> Checkpoint:
+        return self.serde.loads(stored) if self.serialize else stored
+
+    def _sizeof(self, stored: Any) -> int:
+        if self.max_bytes is None:
+            return 0
+        return len(stored) if self.serialize else len(self.serde.dumps(stored))
+
+    def _full(self, thread_id: str) -> Checkpoint:
+        checkpoint = self._load(self.storage[thread_id])
+        for delta in self.deltas.get(thread_id, ()):
+            checkpoint = apply_delta(checkpoint, self._load(delta))
+        return checkpoint
+
+    def _touch(self, thread_id: str) -> None:
+        # move to the end, the most recently used
+        self.storage[thread_id] = self.storage.pop(thread_id)
+        self._used_at[thread_id] = time.monotonic()
+
+    def _resize(self, thread_id: str, size: int) -> None:
+        self._bytes += size - self._sizes.get(thread_id, 0)
+        self._sizes[thread_id] = size
+
+    def _push(self, thread_id: str) -> None:
+        """Move the latest checkpoint of the thread to its past ones, if kept."""
+        if self.max_history <= 1 or thread_id not in self.storage:
+            return
+        if self.deltas.get(thread_id):
+            stored = self._dump(self._full(thread_id))
+        else:
+            stored = self.storage[thread_id]
+        past = self.past.setdefault(thread_id, [])
+        sizes = self._past_sizes.setdefault(thread_id, [])
+        past.append((self._ts[thread_id], stored))
+        sizes.append(self._sizeof(stored))
+        self._bytes += sizes[-1]
+        if (pruned := len(past) - self.max_history + 1) > 0:
+            del past[:pruned]
+            self._bytes -= sum(sizes[:pruned])
+            del sizes[:pruned]
+
+    def _evict(self, thread_id: str) -> None:
+        if self.spill is not None:
+            config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
+            for _, stored in self.past.get(thread_id, ()):
+                self.spill.put(config, self._load(stored))
+            self.spill.put(config, self._full(thread_id))
+        del self.storage[thread_id]
+        self.deltas.pop(thread_id, None)
+        self.past.pop(thread_id, None)
+        self._ts.pop(thread_id, None)
+        self._used_at.pop(thread_id, None)
+        self._bytes -= self._sizes.pop(thread_id, 0)
+        self._bytes -= sum(self._past_sizes.pop(thread_id, ()))
+        self._evictions += 1
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        expired_at = time.monotonic() - self.ttl
+        # threads are in order of use, so those expired are first
+        while self.storage:
+            thread_id = next(iter(self.storage))
+            if self._used_at.get(thread_id, expired_at) > expired_at:
+                break
+            self._evict(thread_id)
+
+    def _shrink(self, keep: str) -> None:
+        while (
+            self.max_entries is not None and len(self.storage) > self.max_entries
+        ) or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            thread_id = next(iter(self.storage))
+            if thread_id == keep:
+                break
+            self._evict(thread_id)
+
+    def _store(self, thread_id: str, checkpoint: Checkpoint) -> None:
+        self._push(thread_id)
+        stored = self._dump(checkpoint)
+        self.deltas.pop(thread_id, None)
+        self.storage.pop(thread_id, None)
+        self.storage[thread_id] = stored
+        self._ts[thread_id] = checkpoint["ts"]
+        self._used_at[thread_id] = time.monotonic()
+        self._resize(thread_id, self._sizeof(stored))
+        self._shrink(thread_id)
+
     def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
-        return self.storage.get(config["configurable"]["thread_id"], None)
+        thread_id = config["configurable"]["thread_id"]
+        thread_ts = config["configurable"].get("thread_ts")
+        with self._lock:
+            self._expire()
+            if thread_id in self.storage:
+                self._hits += 1
+                self._touch(thread_id)
+                if not thread_ts or thread_ts == self._ts[thread_id]:
+                    return self._full(thread_id)
+                for ts, stored in self.past.get(thread_id, ()):
+                    if ts == thread_ts:
+                        return self._load(stored)
+                return self.spill.get(config) if self.spill is not None else None
+            self._misses += 1
+            if self.spill is None:
+                return None
+            checkpoint = self.spill.get(config)
+            # only the latest checkpoint is cached, earlier ones stay in spill
+            if checkpoint is not None and not thread_ts:
+                self._store(thread_id, checkpoint)
+            return checkpoint
+
+    def history(self, config: RunnableConfig) -> Iterator[Checkpoint]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+            if thread_id in self.storage:
+                checkpoints = [self._full(thread_id)] + [
+                    self._load(stored)
+                    for _, stored in reversed(self.past.get(thread_id, []))
+                ]
+            elif self.spill is not None:
+                checkpoints = list(self.spill.history(config))
+            else:
+                checkpoints = []
+        yield from checkpoints
 
     def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
-        return self.storage.update({config["configurable"]["thread_id"]: checkpoint})
+        with self._lock:
+            self._expire()
+            self._store(config["configurable"]["thread_id"], checkpoint)
+
+    def put_delta(
+        self,
+        config: RunnableConfig,
+        delta: Checkpoint,
+        full: Callable[[], Checkpoint],
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+            deltas = self.deltas.get(thread_id, [])
+            if (
+                thread_id not in self.storage
+                or len(deltas) + 1 >= self.snapshot_interval
+            ):
+                self._store(thread_id, full())
+            else:
+                self._push(thread_id)
+                stored = self._dump(delta)
+                self.deltas[thread_id] = [*deltas, stored]
+                self._ts[thread_id] = delta["ts"]
+                self._touch(thread_id)
+                self._resize(
+                    thread_id, self._sizes.get(thread_id, 0) + self._sizeof(stored)
+                )
+                self._shrink(thread_id)
+
+    @property
+    def _inline(self) -> bool:
+        """Whether the async methods run the sync ones in the event loop, rather
+        than waiting for an I/O thread, as all they do is hold the lock briefly."""
+        return self.spill is None and not self.serialize and self.max_bytes is None
+
+    async def aget(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        if not self._inline:
+            return await super().aget(config)
+        return self.get(config)
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        if not self._inline:
+            return await super().aput(config, checkpoint)
+        return self.put(config, checkpoint)
+
+    async def aput_delta(
+        self,
+        config: RunnableConfig,
+        delta: Checkpoint,
+        full: Callable[[], Checkpoint],
+    ) -> None:
+        if not self._inline:
+            return await super().aput_delta(config, delta, full)
+        return self.put_delta(config, delta, full)
@@ -0,0 +1,217 @@
+import lzma
+import pickle
+import struct
+import zlib
+from typing import (
+    Any,
+    Iterable,
+    Literal,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Sequence,
+    Union,
+    runtime_checkable,
+)
+
+_COUNT = struct.Struct("<I")
+
+
+@runtime_checkable
+class SerializerProtocol(Protocol):
+    """Encodes checkpoints to bytes, and back, for savers that store bytes."""
+
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    def loads(self, data: bytes) -> Any:
+        ...
+
+
+class _OutOfBand:
+    """Pickles bytes or a bytearray as an out-of-band buffer."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Union[bytes, bytearray]) -> None:
+        self.value = value
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        return type(self.value), (pickle.PickleBuffer(self.value),)
+
+
+class PickleSerializer:
+    """Pickles with protocol 5, which handles sets, tuples, defaultdicts and any
+    other picklable value as is.
+
+    Large buffers are written out-of-band, after the pickle, instead of being
+    copied into it, and loaded as views of the data, eg. numpy arrays without
+    a copy. The pickler only does so for types that support it, eg. arrays, so
+    large bytes and bytearrays are too, when they're values of the dicts in
+    the object up to two levels deep, eg. the channel values of a checkpoint.
+
+    Only load data from trusted storage, as with any pickle."""
+
+    def __init__(self, out_of_band_threshold: int = 64 * 1024) -> None:
+        self.out_of_band_threshold = out_of_band_threshold
+
+    def _wrap(self, obj: Any, depth: int) -> Any:
+        if isinstance(obj, (bytes, bytearray)):
+            if len(obj) >= self.out_of_band_threshold:
+                return _OutOfBand(obj)
+        elif depth and obj.__class__ is dict:
+            wrapped = {k: self._wrap(v, depth - 1) for k, v in obj.items()}
+            # keep the original if nothing was wrapped, eg. to keep dict subclasses
+            if any(w is not v for w, v in zip(wrapped.values(), obj.values())):
+                return wrapped
+        return obj
+
+    def dumps(self, obj: Any) -> bytes:
+        buffers: list[pickle.PickleBuffer] = []
+        data = pickle.dumps(
+            self._wrap(obj, 2), protocol=5, buffer_callback=buffers.append
+        )
+        views = [b.raw() for b in buffers]
+        # number of buffers and their sizes, the pickle, and the buffers
+        return b"".join(
+            [
+                _COUNT.pack(len(views)),
+                struct.pack(f"<{len(views)}Q", *(v.nbytes for v in views)),
+                data,
+                *views,
+            ]
+        )
+
+    def loads(self, data: bytes) -> Any:
+        view = memoryview(data)
+        (count,) = _COUNT.unpack_from(view)
+        sizes = struct.unpack_from(f"<{count}Q", view, _COUNT.size)
+        start = _COUNT.size + 8 * count
+        end = pos = len(view) - sum(sizes)
+        buffers = []
+        for size in sizes:
+            buffers.append(view[pos : pos + size])
+            pos += size
+        return pickle.loads(view[start:end], buffers=buffers)
+
+
+class _Encoded(NamedTuple):
+    """A value encoded, and maybe compressed, by CompressedSerializer."""
+
+    codec: str
+    """How data is compressed, one of "", "zlib" or "lzma"."""
+
+    data: bytes
+
+
+class CompressedSerializer:
+    """Compresses checkpoints with zlib or lzma, before encoding them with serde,
+    which must handle bytes and tuples, as PickleSerializer does.
+
+    Each channel value is encoded on its own, and compressed if that takes at
+    least threshold bytes, except for the channels in skip_channels, eg. those
+    holding data that is compressed already. Other objects are compressed whole.
+
+    Small values compress poorly on their own, as there's little to find repeated
+    in them. With zlib, a preset dictionary of data like theirs, eg. from
+    train_zdict(), helps with that. The same zdict is needed to load them."""
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        *,
+        method: Literal["zlib", "lzma"] = "zlib",
+        level: Optional[int] = None,
+        threshold: int = 1024,
+        skip_channels: Sequence[str] = (),
+        zdict: Optional[bytes] = None,
+    ) -> None:
+        if zdict is not None and method != "zlib":
+            raise ValueError("zdict is only supported by zlib")
+        self.serde = serde or PickleSerializer()
+        self.method = method
+        self.level = level
+        self.threshold = threshold
+        self.skip_channels = frozenset(skip_channels)
+        self.zdict = zdict
+        # loading the dictionary is costly, so copy a compressor that has it
+        self._primed = (
+            zlib.compressobj(self._zlib_level, zdict=zdict) if zdict else None
+        )
+
+    @property
+    def _zlib_level(self) -> int:
+        return zlib.Z_DEFAULT_COMPRESSION if self.level is None else self.level
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.method == "lzma":
+            return lzma.compress(data, preset=self.level)
+        if self._primed is None:
+            return zlib.compress(data, self._zlib_level)
+        compressor = self._primed.copy()
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, codec: str, data: bytes) -> bytes:
+        if codec == "lzma":
+            return lzma.decompress(data)
+        if codec == "zlib":
+            if self.zdict is None:
+                return zlib.decompress(data)
+            decompressor = zlib.decompressobj(zdict=self.zdict)
+            return decompressor.decompress(data) + decompressor.flush()
+        return data
+
+    def _encode(self, value: Any) -> _Encoded:
+        data = self.serde.dumps(value)
+        if len(data) >= self.threshold:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                return _Encoded(self.method, compressed)
+        return _Encoded("", data)
+
+    def _decode(self, value: Any) -> Any:
+        if isinstance(value, _Encoded):
+            return self.serde.loads(self._decompress(value.codec, value.data))
+        return value
+
+    def dumps(self, obj: Any) -> bytes:
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict):
+            obj = {
+                **obj,
+                "channel_values": {
+                    k: v if k in self.skip_channels else self._encode(v)
+                    for k, v in obj["channel_values"].items()
+                },
+            }
+        else:
+            obj = self._encode(obj)
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        obj = self.serde.loads(data)
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict):
+            obj["channel_values"] = {
+                k: self._decode(v) for k, v in obj["channel_values"].items()
+            }
+            return obj
+        return self._decode(obj)
+
+
+def train_zdict(
+    samples: Iterable[Any],
+    serde: Optional[SerializerProtocol] = None,
+    size: int = 32 * 1024,
+) -> bytes:
+    """Build a zlib preset dictionary for CompressedSerializer from sample values,
+    eg. typical channel values, encoded with serde. zlib only looks back 32KB, and
+    finds matches near the end of the dictionary most cheaply, so pass the most
+    representative samples last."""
+    serde = serde or PickleSerializer()
+    seen: set[bytes] = set()
+    encoded: list[bytes] = []
+    for sample in samples:
+        data = serde.dumps(sample)
+        if data not in seen:
+            seen.add(data)
+            encoded.append(data)
+    return b"".join(encoded)[-size:]
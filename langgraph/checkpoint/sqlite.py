@@ -0,0 +1,220 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from types import TracebackType
+from typing import AsyncIterator, Callable, Iterator, Optional, Type
+
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.utils import ConfigurableFieldSpec
+from typing_extensions import Self
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint
+
+_CREATE = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    PRIMARY KEY (thread_id, ts)
+)
+"""
+
+_SELECT = """
+SELECT checkpoint FROM checkpoints WHERE thread_id = ? ORDER BY ts DESC LIMIT 1
+"""
+
+_SELECT_TS = "SELECT checkpoint FROM checkpoints WHERE thread_id = ? AND ts = ?"
+
+_SELECT_HISTORY = """
+SELECT checkpoint FROM checkpoints WHERE thread_id = ? ORDER BY ts DESC LIMIT ?
+"""
+
+_UPSERT = """
+INSERT OR REPLACE INTO checkpoints (thread_id, ts, checkpoint) VALUES (?, ?, ?)
+"""
+
+_PRUNE = """
+DELETE FROM checkpoints WHERE thread_id = ? AND ts NOT IN (
+    SELECT ts FROM checkpoints WHERE thread_id = ? ORDER BY ts DESC LIMIT ?
+)
+"""
+
+_Write = tuple[str, str, bytes, "Future[None]"]
+
+
+class SqliteSaver(BaseCheckpointSaver):
+    """Saves the latest max_history checkpoints of each thread to a SQLite
+    database file, encoded with serde, one row each.
+
+    The database is opened in WAL mode, so that reads don't wait for writes. Each
+    thread reading checkpoints has its own connection, and all writes go through
+    a single writer thread, which commits the checkpoints put by concurrent
+    threads together, in one transaction, pruning older ones. put() returns once its checkpoint is
+    committed. aget() and aput() don't block the event loop, nor use its default
+    executor.
+
+    ```python
+    with SqliteSaver(path="checkpoints.db") as saver:
+        app = Pregel(nodes=..., saver=saver)
+        ...
+    ```
+    """
+
+    path: str
+    """Path of the database file, created if it doesn't exist."""
+
+    _local: threading.local = PrivateAttr(default_factory=threading.local)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _queue: Optional[queue.SimpleQueue[Optional[_Write]]] = PrivateAttr(default=None)
+    _writer: Optional[threading.Thread] = PrivateAttr(default=None)
+
+    @property
+    def config_specs(self) -> list[ConfigurableFieldSpec]:
+        return [
+            ConfigurableFieldSpec(
+                id="thread_id",
+                annotation=str,
+                name="Thread ID",
+                description=None,
+                default="",
+                is_shared=True,
+            ),
+            ConfigurableFieldSpec(
+                id="thread_ts",
+                annotation=Optional[str],
+                name="Thread Timestamp",
+                description="ts of the checkpoint to start from, if not the latest.",
+                default=None,
+                is_shared=True,
+            ),
+        ]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # in WAL mode a commit is durable once the WAL is synced at checkpoints,
+        # which can't corrupt the database, and makes commits much cheaper
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_CREATE)
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread, opened on first use."""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _submit(self, config: RunnableConfig, checkpoint: Checkpoint) -> Future[None]:
+        thread_id = config["configurable"]["thread_id"]
+        data = self.serde.dumps(checkpoint)
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.SimpleQueue()
+                self._writer = threading.Thread(
+                    target=self._write_loop,
+                    args=(self._queue, self._connect(), self.max_history),
+                    name="sqlite-saver-writer",
+                    daemon=True,
+                )
+                self._writer.start()
+            fut: Future[None] = Future()
+            self._queue.put((thread_id, checkpoint["ts"], data, fut))
+            return fut
+
+    @staticmethod
+    def _write_loop(
+        writes: queue.SimpleQueue[Optional[_Write]],
+        conn: sqlite3.Connection,
+        max_history: int,
+    ) -> None:
+        while True:
+            # commit together all checkpoints put while the previous commit ran
+            batch = [writes.get()]
+            while not writes.empty():
+                batch.append(writes.get())
+            pending = [w for w in batch if w is not None]
+            if pending:
+                try:
+                    with conn:
+                        conn.executemany(_UPSERT, [w[:3] for w in pending])
+                        conn.executemany(
+                            _PRUNE,
+                            [(t, t, max_history) for t in {w[0] for w in pending}],
+                        )
+                except Exception as exc:
+                    for *_, fut in pending:
+                        fut.set_exception(exc)
+                else:
+                    for *_, fut in pending:
+                        fut.set_result(None)
+            if len(pending) < len(batch):
+                conn.close()
+                return
+
+    def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        thread_id = config["configurable"]["thread_id"]
+        if thread_ts := config["configurable"].get("thread_ts"):
+            cursor = self._connection().execute(_SELECT_TS, (thread_id, thread_ts))
+        else:
+            cursor = self._connection().execute(_SELECT, (thread_id,))
+        row = cursor.fetchone()
+        return self.serde.loads(row[0]) if row is not None else None
+
+    def history(self, config: RunnableConfig) -> Iterator[Checkpoint]:
+        rows = (
+            self._connection()
+            .execute(
+                _SELECT_HISTORY,
+                (config["configurable"]["thread_id"], self.max_history),
+            )
+            .fetchall()
+        )
+        for row in rows:
+            yield self.serde.loads(row[0])
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        self._submit(config, checkpoint).result()
+
+    async def aget(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        return await self._run_io(self.get, config)
+
+    async def ahistory(self, config: RunnableConfig) -> AsyncIterator[Checkpoint]:
+        for checkpoint in await self._run_io(lambda: list(self.history(config))):
+            yield checkpoint
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        await asyncio.wrap_future(self._submit(config, checkpoint))
+
+    async def aput_delta(
+        self,
+        config: RunnableConfig,
+        delta: Checkpoint,
+        full: Callable[[], Checkpoint],
+    ) -> None:
+        await self.aput(config, full())
+
+    def close(self) -> None:
+        """Wait for pending writes to be committed, and stop the writer and I/O
+        threads. The saver can still be used afterwards, starting them again."""
+        with self._lock:
+            writes, writer = self._queue, self._writer
+            self._queue = self._writer = None
+        if writes is not None and writer is not None:
+            writes.put(None)
+            writer.join()
+        super().close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
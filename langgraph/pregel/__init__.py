@@ -2,14 +2,25 @@ from __future__ import annotations
 
 import asyncio
 import concurrent.futures
+import time
 from collections import defaultdict, deque
+from concurrent.futures import Executor
+from contextlib import (
+    AsyncExitStack,
+    ExitStack,
+    asynccontextmanager,
+    contextmanager,
+)
 from functools import partial
 from typing import (
     Any,
     AsyncIterator,
     Awaitable,
     Callable,
+    Collection,
+    Container,
     Iterator,
+    Literal,
     Mapping,
     Optional,
     Sequence,
@@ -24,7 +35,13 @@ from langchain_core.callbacks.manager import (
     CallbackManagerForChainRun,
 )
 from langchain_core.globals import get_debug
-from langchain_core.pydantic_v1 import BaseModel, Field, create_model, root_validator
+from langchain_core.pydantic_v1 import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    create_model,
+    root_validator,
+)
 from langchain_core.runnables import (
     Runnable,
     RunnableSerializable,
@@ -47,20 +64,32 @@ from langgraph.channels.base import (
     ChannelsManager,
     EmptyChannelError,
     create_checkpoint,
+    create_delta,
 )
 from langgraph.channels.last_value import LastValue
+from langgraph.checkpoint.background import AsyncCheckpointWriter, CheckpointWriter
 from langgraph.checkpoint.base import (
     BaseCheckpointSaver,
     Checkpoint,
     CheckpointAt,
+    copy_checkpoint,
     empty_checkpoint,
 )
 from langgraph.constants import CONFIG_KEY_READ, CONFIG_KEY_SEND
 from langgraph.pregel.debug import print_checkpoint, print_step_start
-from langgraph.pregel.io import map_input, map_output
+from langgraph.pregel.executor import PregelExecutor
+from langgraph.pregel.io import map_input, map_output, map_task_output
 from langgraph.pregel.log import logger
+from langgraph.pregel.plan import ExecutionPlan, compile_plan
 from langgraph.pregel.read import ChannelBatch, ChannelInvoke
 from langgraph.pregel.reserved import ReservedChannels
+from langgraph.pregel.retry import (
+    RetryPolicy,
+    abatch_with_retry,
+    arun_with_retry,
+    batch_with_retry,
+    run_with_retry,
+)
 from langgraph.pregel.validate import validate_graph
 from langgraph.pregel.write import ChannelWrite
 
@@ -72,6 +101,12 @@ WriteValue = Union[
 ]
 
 
+StreamMode = Literal["values", "tasks"]
+"""How Pregel.stream() emits output: "values" yields the value of the output
+channels updated in each step, "tasks" yields the writes to output channels of
+each task as soon as it finishes."""
+
+
 def _coerce_write_value(value: WriteValue) -> Runnable[Input, Output]:
     if not isinstance(value, Runnable) and not callable(value):
         return coerce_to_runnable(lambda _: value)
@@ -86,6 +121,10 @@ class Channel:
         channels: str,
         key: Optional[str] = None,
         when: Optional[Callable[[Any], bool]] = None,
+        *,
+        run_in_process: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[float] = None,
     ) -> ChannelInvoke:
         ...
 
@@ -96,6 +135,10 @@ class Channel:
         channels: Sequence[str],
         key: None = None,
         when: Optional[Callable[[Any], bool]] = None,
+        *,
+        run_in_process: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[float] = None,
     ) -> ChannelInvoke:
         ...
 
@@ -105,9 +148,17 @@ class Channel:
         channels: Union[str, Sequence[str]],
         key: Optional[str] = None,
         when: Optional[Callable[[Any], bool]] = None,
+        *,
+        run_in_process: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[float] = None,
     ) -> ChannelInvoke:
         """Runs process.invoke() each time channels are updated,
-        with a dict of the channel values as input."""
+        with a dict of the channel values as input.
+
+        Pass run_in_process=True to run it in the Pregel process_executor,
+        a retry_policy to retry it when it fails, and a timeout in seconds
+        to bound how long each of its tasks can take."""
         if not isinstance(channels, str) and key is not None:
             raise ValueError(
                 "Can't specify a key when subscribing to multiple channels"
@@ -121,12 +172,33 @@ class Channel:
             ),
             triggers=[channels] if isinstance(channels, str) else channels,
             when=when,
+            run_in_process=run_in_process,
+            retry_policy=retry_policy,
+            timeout=timeout,
         )
 
     @classmethod
-    def subscribe_to_each(cls, inbox: str, key: Optional[str] = None) -> ChannelBatch:
-        """Runs process.batch() with the content of inbox each time it is updated."""
-        return ChannelBatch(channel=inbox, key=key)
+    def subscribe_to_each(
+        cls,
+        inbox: str,
+        key: Optional[str] = None,
+        *,
+        run_in_process: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[float] = None,
+    ) -> ChannelBatch:
+        """Runs process.batch() with the content of inbox each time it is updated.
+
+        Pass run_in_process=True to run it in the Pregel process_executor,
+        a retry_policy to retry it when it fails, and a timeout in seconds
+        to bound how long each of its tasks can take."""
+        return ChannelBatch(
+            channel=inbox,
+            key=key,
+            run_in_process=run_in_process,
+            retry_policy=retry_policy,
+            timeout=timeout,
+        )
 
     @classmethod
     def write_to(
@@ -158,18 +230,67 @@ class Pregel(
 
     step_timeout: Optional[float] = None
 
+    run_timeout: Optional[float] = None
+    """Wall-clock budget in seconds for each invocation, across all steps.
+    Tasks still running when it's spent are cancelled, and no further steps
+    are started, raising TimeoutError."""
+
     debug: bool = Field(default_factory=get_debug)
 
     saver: Optional[BaseCheckpointSaver] = None
 
+    write_behind: int = 0
+    """If above 0, save checkpoints in the background, so that the next step starts
+    without waiting for the saver, with at most this many waiting to be saved.
+    An error saving a checkpoint is raised at the next step boundary, and each
+    invocation waits for its checkpoints to be saved before it finishes."""
+
+    executor: Optional[PregelExecutor] = None
+    """Thread pool shared by all invocations, for sync execution. If not provided,
+    each invocation creates its own, sized by max_concurrency in config."""
+
+    process_executor: Optional[Executor] = None
+    """Process pool, eg. a ProcessPoolExecutor, to run nodes created with
+    run_in_process=True in. Required if there are any such nodes."""
+
+    relaxed_barrier: bool = False
+    """Apply the writes of each task as soon as it finishes, and start the nodes
+    they trigger right away, instead of waiting for all tasks of the step.
+
+    A task's step is one more than that of the task whose writes triggered it,
+    and recursion_limit bounds it as usual. Compared to the default mode:
+    - a node triggered while it is running runs again when it finishes, with the
+      latest values, so it may not see every intermediate value of a channel
+    - values read with ChannelRead during a task can be updated by other tasks
+    - step_timeout bounds the wait for the next task to finish
+    - output is streamed as each task finishes, and END_OF_STEP checkpoints are
+      saved after each task
+
+    Graphs in which a channel that can't merge writes applied separately, eg.
+    LastValue, is written to by more than one node run in the default mode, as
+    do batch() and abatch()."""
+
+    _plan: ExecutionPlan = PrivateAttr()
+    """Precomputed facts about the graph, shared by all invocations."""
+
     class Config:
         arbitrary_types_allowed = True
 
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        self._plan = compile_plan(
+            self.nodes, self.channels, self.hidden, self.process_executor
+        )
+
     @root_validator(skip_on_failure=True)
     def validate_pregel(cls, values: dict[str, Any]) -> dict[str, Any]:
         validate_graph(
             values["nodes"], values["channels"], values["input"], values["output"]
         )
+        if values["process_executor"] is None and any(
+            node.run_in_process for node in values["nodes"].values()
+        ):
+            raise ValueError("Nodes set to run_in_process require a process_executor")
         return values
 
     @property
@@ -214,6 +335,34 @@ class Pregel(
                 **{k: (self.channels[k].ValueType, None) for k in self.output},
             )
 
+    @contextmanager
+    def _get_executor(self, config: RunnableConfig) -> Iterator[Executor]:
+        # invocations made from a task running in the shared pool get their own
+        # executor, as waiting on the pool from one of its workers can deadlock
+        if self.executor is not None and not self.executor.in_worker():
+            yield self.executor
+        else:
+            with get_executor_for_config(config) as executor:
+                yield executor
+
+    @contextmanager
+    def _checkpoint_writer(self) -> Iterator[Optional[CheckpointWriter]]:
+        if self.saver is None or self.write_behind < 1:
+            yield None
+        else:
+            with CheckpointWriter(self.saver, self.write_behind) as writer:
+                yield writer
+
+    @asynccontextmanager
+    async def _acheckpoint_writer(
+        self,
+    ) -> AsyncIterator[Optional[AsyncCheckpointWriter]]:
+        if self.saver is None or self.write_behind < 1:
+            yield None
+        else:
+            async with AsyncCheckpointWriter(self.saver, self.write_behind) as writer:
+                yield writer
+
     def _transform(
         self,
         input: Iterator[Union[dict[str, Any], Any]],
@@ -221,106 +370,174 @@ class Pregel(
         config: RunnableConfig,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
     ) -> Iterator[Union[dict[str, Any], Any]]:
         if config["recursion_limit"] < 1:
             raise ValueError("recursion_limit must be at least 1")
+        run_deadline = _deadline(self.run_timeout)
+        plan = self._plan
         # assign defaults
         if output is None:
-            output = [chan for chan in self.channels if chan not in self.hidden]
-        # copy nodes to ignore mutations during execution
-        processes = {**self.nodes}
+            output = plan.output
         # get checkpoint from saver, or create an empty one
-        checkpoint = self.saver.get(config) if self.saver else None
-        checkpoint = checkpoint or empty_checkpoint()
+        saved = self.saver.get(config) if self.saver else None
+        # copied, as the saver's own checkpoint mustn't change with the run
+        checkpoint = copy_checkpoint(saved) if saved else empty_checkpoint()
+        # channel versions as of the last save, to save deltas against
+        saved_versions = _saved_versions(config, saved)
         # create channels from checkpoint
-        with ChannelsManager(
-            self.channels, checkpoint
-        ) as channels, get_executor_for_config(config) as executor:
+        with ChannelsManager(self.channels, checkpoint) as channels, self._get_executor(
+            config
+        ) as executor, self._checkpoint_writer() as writer:
             # map inputs to channel updates
-            _apply_writes(
+            updated_channels: Optional[set[str]] = _apply_writes(
+                plan,
                 checkpoint,
                 channels,
                 deque(w for c in input for w in map_input(self.input, c)),
                 config,
                 0,
             )
+            # a saved checkpoint can have nodes left pending by a previous run,
+            # so in the first step every node is a candidate
+            if saved is not None:
+                updated_channels = None
 
             read = partial(_read_channel, channels)
 
-            # Similarly to Bulk Synchronous Parallel / Pregel model
-            # computation proceeds in steps, while there are channel updates
-            # channel updates from step N are only visible in step N+1
-            # channels are guaranteed to be immutable for the duration of the step,
-            # with channel updates applied only at the transition between steps
-            for step in range(config["recursion_limit"]):
-                next_tasks = _prepare_next_tasks(checkpoint, processes, channels)
-
-                # if no more tasks, we're done
-                if not next_tasks:
-                    break
-
-                if self.debug:
-                    print_step_start(step, next_tasks)
+            if self.relaxed_barrier and not plan.contended:
+                yield from self._relaxed_steps(
+                    plan,
+                    checkpoint,
+                    channels,
+                    updated_channels,
+                    read,
+                    executor,
+                    run_manager,
+                    config,
+                    output,
+                    stream_mode,
+                    run_deadline,
+                    saved_versions,
+                    writer,
+                )
+            else:
+                # Similarly to Bulk Synchronous Parallel / Pregel model
+                # computation proceeds in steps, while there are channel updates
+                # channel updates from step N are only visible in step N+1
+                # channels are guaranteed to be immutable for the duration of the step,
+                # with channel updates applied only at the transition between steps
+                for step in range(config["recursion_limit"]):
+                    next_tasks = _prepare_next_tasks(
+                        plan, checkpoint, channels, updated_channels
+                    )
 
-                # collect all writes to channels, without applying them yet
-                pending_writes = deque[tuple[str, Any]]()
+                    # if no more tasks, we're done
+                    if not next_tasks:
+                        break
+
+                    # don't start a step if the budget for the run is spent
+                    _check_budget(run_deadline, step)
+
+                    if self.debug:
+                        print_step_start(step, next_tasks)
+
+                    # collect the writes of each task, without applying them yet
+                    task_writes = [deque[tuple[str, Any]]() for _ in next_tasks]
+
+                    # prepare tasks with config
+                    tasks_w_config = [
+                        (
+                            proc,
+                            input,
+                            patch_config(
+                                config,
+                                run_name=name,
+                                callbacks=run_manager.get_child(f"graph:step:{step}"),
+                                configurable={
+                                    # deque.extend is thread-safe
+                                    CONFIG_KEY_SEND: writes.extend,
+                                    CONFIG_KEY_READ: read,
+                                },
+                            ),
+                            name,
+                            writes,
+                        )
+                        for (proc, input, name), writes in zip(next_tasks, task_writes)
+                    ]
 
-                # prepare tasks with config
-                tasks_w_config = [
-                    (
-                        proc,
-                        input,
-                        patch_config(
+                    # execute tasks, and wait for one to fail or all to finish.
+                    # each task is independent from all other concurrent tasks
+                    futures = {
+                        executor.submit(
+                            run_with_retry,
+                            proc,
+                            input,
                             config,
-                            run_name=name,
-                            callbacks=run_manager.get_child(f"graph:step:{step}"),
-                            configurable={
-                                # deque.extend is thread-safe
-                                CONFIG_KEY_SEND: pending_writes.extend,
-                                CONFIG_KEY_READ: read,
-                            },
-                        ),
+                            plan.nodes[name].proc.retry_policy,
+                        ): (name, writes)
+                        for proc, input, config, name, writes in tasks_w_config
+                    }
+                    # a task times out once its node's timeout expires, and all of
+                    # them once the step timeout or the run budget expires
+                    for fut in _completed(
+                        {
+                            fut: _deadline(plan.nodes[name].proc.timeout)
+                            for fut, (name, _) in futures.items()
+                        },
+                        _earliest(_deadline(self.step_timeout), run_deadline),
+                        step,
+                    ):
+                        # stream the writes of each task as soon as it finishes
+                        if stream_mode == "tasks":
+                            name, writes = futures[fut]
+                            if task_output := map_task_output(output, writes):
+                                yield {
+                                    "node": name,
+                                    "step": step,
+                                    "writes": task_output,
+                                }
+
+                    pending_writes = [w for writes in task_writes for w in writes]
+
+                    # apply writes to channels
+                    updated_channels = _apply_writes(
+                        plan, checkpoint, channels, pending_writes, config, step + 1
                     )
-                    for proc, input, name in next_tasks
-                ]
-
-                # execute tasks, and wait for one to fail or all to finish.
-                # each task is independent from all other concurrent tasks
-                done, inflight = concurrent.futures.wait(
-                    [
-                        executor.submit(proc.invoke, input, config)
-                        for proc, input, config in tasks_w_config
-                    ],
-                    return_when=concurrent.futures.FIRST_EXCEPTION,
-                    timeout=self.step_timeout,
-                )
-
-                # interrupt on failure or timeout
-                _interrupt_or_proceed(done, inflight, step)
-
-                # apply writes to channels
-                _apply_writes(checkpoint, channels, pending_writes, config, step + 1)
-
-                if self.debug:
-                    print_checkpoint(step, channels)
-
-                # yield current value and checkpoint view
-                if step_output := map_output(output, pending_writes, channels):
-                    yield step_output
-                    # we can detect updates when output is multiple channels (ie. dict)
-                    if not isinstance(output, str):
-                        # if view was updated, apply writes to channels
-                        _apply_writes_from_view(checkpoint, channels, step_output)
 
-                # save end of step checkpoint
-                if self.saver is not None and self.saver.at == CheckpointAt.END_OF_STEP:
-                    checkpoint = create_checkpoint(checkpoint, channels)
-                    self.saver.put(config, checkpoint)
+                    if self.debug:
+                        print_checkpoint(step, channels)
+
+                    # yield current value and checkpoint view
+                    if stream_mode == "values" and (
+                        step_output := map_output(output, pending_writes, channels)
+                    ):
+                        yield step_output
+                        # we can detect updates when output is multiple channels (ie. dict)
+                        if not isinstance(output, str):
+                            # if view was updated, apply writes to channels
+                            updated_channels |= _apply_writes_from_view(
+                                checkpoint, channels, step_output
+                            )
+
+                    # save end of step checkpoint
+                    if (
+                        self.saver is not None
+                        and self.saver.at == CheckpointAt.END_OF_STEP
+                    ):
+                        self._put_checkpoint(
+                            config, checkpoint, channels, saved_versions, writer
+                        )
 
             # save end of run checkpoint
             if self.saver is not None and self.saver.at == CheckpointAt.END_OF_RUN:
-                checkpoint = create_checkpoint(checkpoint, channels)
-                self.saver.put(config, checkpoint)
+                self._put_checkpoint(
+                    config, checkpoint, channels, saved_versions, writer
+                )
+
+            # wait for checkpoints saved in the background
+            if writer is not None:
+                writer.flush()
 
     async def _atransform(
         self,
@@ -329,9 +546,11 @@ class Pregel(
         config: RunnableConfig,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
     ) -> AsyncIterator[Union[dict[str, Any], Any]]:
         if config["recursion_limit"] < 1:
             raise ValueError("recursion_limit must be at least 1")
+        run_deadline = _deadline(self.run_timeout)
         # if running from astream_log() run each proc with streaming
         do_stream = next(
             (
@@ -341,106 +560,836 @@ class Pregel(
             ),
             None,
         )
+        plan = self._plan
         # assign defaults
         if output is None:
-            output = [chan for chan in self.channels if chan not in self.hidden]
-        # copy nodes to ignore mutations during execution
-        processes = {**self.nodes}
+            output = plan.output
         # get checkpoint from saver, or create an empty one
-        checkpoint = await self.saver.aget(config) if self.saver else None
-        checkpoint = checkpoint or empty_checkpoint()
+        saved = await self.saver.aget(config) if self.saver else None
+        # copied, as the saver's own checkpoint mustn't change with the run
+        checkpoint = copy_checkpoint(saved) if saved else empty_checkpoint()
+        # channel versions as of the last save, to save deltas against
+        saved_versions = _saved_versions(config, saved)
         # create channels from checkpoint
-        async with AsyncChannelsManager(self.channels, checkpoint) as channels:
+        async with AsyncChannelsManager(
+            self.channels, checkpoint
+        ) as channels, self._acheckpoint_writer() as writer:
             # map inputs to channel updates
-            _apply_writes(
+            updated_channels: Optional[set[str]] = _apply_writes(
+                plan,
                 checkpoint,
                 channels,
                 deque([w async for c in input for w in map_input(self.input, c)]),
                 config,
                 0,
             )
+            # a saved checkpoint can have nodes left pending by a previous run,
+            # so in the first step every node is a candidate
+            if saved is not None:
+                updated_channels = None
 
             read = partial(_read_channel, channels)
 
-            # Similarly to Bulk Synchronous Parallel / Pregel model
-            # computation proceeds in steps, while there are channel updates
-            # channel updates from step N are only visible in step N+1,
-            # channels are guaranteed to be immutable for the duration of the step,
-            # channel updates being applied only at the transition between steps
-            for step in range(config["recursion_limit"]):
-                next_tasks = _prepare_next_tasks(checkpoint, processes, channels)
+            if self.relaxed_barrier and not plan.contended:
+                async for chunk in self._arelaxed_steps(
+                    plan,
+                    checkpoint,
+                    channels,
+                    updated_channels,
+                    read,
+                    do_stream is not None,
+                    run_manager,
+                    config,
+                    output,
+                    stream_mode,
+                    run_deadline,
+                    saved_versions,
+                    writer,
+                ):
+                    yield chunk
+            else:
+                # Similarly to Bulk Synchronous Parallel / Pregel model
+                # computation proceeds in steps, while there are channel updates
+                # channel updates from step N are only visible in step N+1,
+                # channels are guaranteed to be immutable for the duration of the step,
+                # channel updates being applied only at the transition between steps
+                for step in range(config["recursion_limit"]):
+                    next_tasks = _prepare_next_tasks(
+                        plan, checkpoint, channels, updated_channels
+                    )
 
-                # if no more tasks, we're done
-                if not next_tasks:
-                    break
+                    # if no more tasks, we're done
+                    if not next_tasks:
+                        break
+
+                    # don't start a step if the budget for the run is spent
+                    _check_budget(run_deadline, step)
+
+                    if self.debug:
+                        print_step_start(step, next_tasks)
+
+                    # collect the writes of each task, without applying them yet
+                    task_writes = [deque[tuple[str, Any]]() for _ in next_tasks]
+
+                    # prepare tasks with config
+                    tasks_w_config = [
+                        (
+                            proc,
+                            input,
+                            patch_config(
+                                config,
+                                run_name=name,
+                                callbacks=run_manager.get_child(f"graph:step:{step}"),
+                                configurable={
+                                    CONFIG_KEY_SEND: writes.extend,
+                                    CONFIG_KEY_READ: read,
+                                },
+                            ),
+                            name,
+                            writes,
+                        )
+                        for (proc, input, name), writes in zip(next_tasks, task_writes)
+                    ]
+
+                    # execute tasks, and wait for one to fail or all to finish.
+                    # each task is independent from all other concurrent tasks
+                    # a task times out once its node's timeout expires, and all of
+                    # them once the step timeout or the run budget expires
+                    tasks = {
+                        asyncio.create_task(
+                            _with_timeout(
+                                arun_with_retry(
+                                    proc,
+                                    input,
+                                    config,
+                                    plan.nodes[name].proc.retry_policy,
+                                    do_stream is not None,
+                                ),
+                                plan.nodes[name].proc.timeout,
+                            )
+                        ): (name, writes)
+                        for proc, input, config, name, writes in tasks_w_config
+                    }
+                    async for task in _acompleted(
+                        tasks,
+                        _earliest(_deadline(self.step_timeout), run_deadline),
+                        step,
+                    ):
+                        # stream the writes of each task as soon as it finishes
+                        if stream_mode == "tasks":
+                            name, writes = tasks[task]
+                            if task_output := map_task_output(output, writes):
+                                yield {
+                                    "node": name,
+                                    "step": step,
+                                    "writes": task_output,
+                                }
+
+                    pending_writes = [w for writes in task_writes for w in writes]
+
+                    # apply writes to channels
+                    updated_channels = _apply_writes(
+                        plan, checkpoint, channels, pending_writes, config, step + 1
+                    )
+
+                    if self.debug:
+                        print_checkpoint(step, channels)
+
+                    # yield current value and checkpoint view
+                    if stream_mode == "values" and (
+                        step_output := map_output(output, pending_writes, channels)
+                    ):
+                        yield step_output
+                        # we can detect updates when output is multiple channels (ie. dict)
+                        if not isinstance(output, str):
+                            # if view was updated, apply writes to channels
+                            updated_channels |= _apply_writes_from_view(
+                                checkpoint, channels, step_output
+                            )
+
+                    # save end of step checkpoint
+                    if (
+                        self.saver is not None
+                        and self.saver.at == CheckpointAt.END_OF_STEP
+                    ):
+                        await self._aput_checkpoint(
+                            config, checkpoint, channels, saved_versions, writer
+                        )
+
+            # save end of run checkpoint
+            if self.saver is not None and self.saver.at == CheckpointAt.END_OF_RUN:
+                await self._aput_checkpoint(
+                    config, checkpoint, channels, saved_versions, writer
+                )
+
+            # wait for checkpoints saved in the background
+            if writer is not None:
+                await writer.flush()
+
+    def _put_checkpoint(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        channels: Mapping[str, BaseChannel],
+        saved_versions: dict[str, int],
+        writer: Optional[CheckpointWriter],
+    ) -> None:
+        """Save a checkpoint, or if the saver takes snapshots at intervals a delta
+        of the channels updated since the versions in saved_versions, unless there
+        are none to base it on. With a writer the checkpoint is saved in the
+        background."""
+        assert self.saver is not None
+        if self.saver.snapshot_interval <= 1 or not saved_versions:
+            if writer is None:
+                self.saver.put(config, create_checkpoint(checkpoint, channels))
+            else:
+                writer.put(config, create_checkpoint(checkpoint, channels))
+        else:
+            delta = create_delta(
+                checkpoint,
+                channels,
+                _changed_channels(self._plan, checkpoint, channels, saved_versions),
+            )
+            if writer is None:
+                self.saver.put_delta(
+                    config, delta, partial(create_checkpoint, checkpoint, channels)
+                )
+            else:
+                writer.put_delta(config, delta)
+        saved_versions.update(checkpoint["channel_versions"])
+
+    async def _aput_checkpoint(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        channels: Mapping[str, BaseChannel],
+        saved_versions: dict[str, int],
+        writer: Optional[AsyncCheckpointWriter],
+    ) -> None:
+        """Save a checkpoint, or if the saver takes snapshots at intervals a delta
+        of the channels updated since the versions in saved_versions, unless there
+        are none to base it on. With a writer the checkpoint is saved in the
+        background."""
+        assert self.saver is not None
+        if self.saver.snapshot_interval <= 1 or not saved_versions:
+            if writer is None:
+                await self.saver.aput(config, create_checkpoint(checkpoint, channels))
+            else:
+                await writer.put(config, create_checkpoint(checkpoint, channels))
+        else:
+            delta = create_delta(
+                checkpoint,
+                channels,
+                _changed_channels(self._plan, checkpoint, channels, saved_versions),
+            )
+            if writer is None:
+                await self.saver.aput_delta(
+                    config, delta, partial(create_checkpoint, checkpoint, channels)
+                )
+            else:
+                await writer.put_delta(config, delta)
+        saved_versions.update(checkpoint["channel_versions"])
+
+    def _relaxed_steps(
+        self,
+        plan: ExecutionPlan,
+        checkpoint: Checkpoint,
+        channels: Mapping[str, BaseChannel],
+        updated_channels: Optional[set[str]],
+        read: Callable[[str], Any],
+        executor: Executor,
+        run_manager: CallbackManagerForChainRun,
+        config: RunnableConfig,
+        output: Union[str, Sequence[str]],
+        stream_mode: StreamMode,
+        run_deadline: Optional[float],
+        saved_versions: dict[str, int],
+        writer: Optional[CheckpointWriter],
+    ) -> Iterator[Union[dict[str, Any], Any]]:
+        """Execute tasks without a barrier between steps, see relaxed_barrier."""
+        # running tasks, with the node name, step and writes of each
+        inflight: dict[
+            concurrent.futures.Future[Any], tuple[str, int, deque[tuple[str, Any]]]
+        ] = {}
+        # deadline of each running task, from its node's timeout
+        deadlines: dict[concurrent.futures.Future[Any], Optional[float]] = {}
+
+        def launch(updated: Optional[set[str]], step: int) -> None:
+            if step >= config["recursion_limit"]:
+                return
+
+            next_tasks = _prepare_next_tasks(
+                plan,
+                checkpoint,
+                channels,
+                updated,
+                {name for name, _, _ in inflight.values()},
+            )
+
+            if self.debug and next_tasks:
+                print_step_start(step, next_tasks)
+
+            for proc, input, name in next_tasks:
+                # each task collects its own writes, applied as soon as it finishes
+                writes = deque[tuple[str, Any]]()
+                task_config = patch_config(
+                    config,
+                    run_name=name,
+                    callbacks=run_manager.get_child(f"graph:step:{step}"),
+                    configurable={
+                        # deque.extend is thread-safe
+                        CONFIG_KEY_SEND: writes.extend,
+                        CONFIG_KEY_READ: read,
+                    },
+                )
+                node = plan.nodes[name].proc
+                fut = executor.submit(
+                    run_with_retry, proc, input, task_config, node.retry_policy
+                )
+                inflight[fut] = (name, step, writes)
+                deadlines[fut] = _deadline(node.timeout)
+
+        launch(updated_channels, 0)
+
+        while inflight:
+            # wait for the next task to finish
+            done, _ = _wait(
+                deadlines,
+                _earliest(_deadline(self.step_timeout), run_deadline),
+                concurrent.futures.FIRST_COMPLETED,
+            )
+
+            # interrupt on failure or timeout
+            if not done or any(fut.exception() for fut in done):
+                _interrupt_or_proceed(
+                    set(done),
+                    set(inflight).difference(done),
+                    min(step for _, step, _ in inflight.values()),
+                )
+
+            for fut in done:
+                name, step, writes = inflight.pop(fut)
+                del deadlines[fut]
+
+                # apply writes of this task to channels
+                updated = _apply_writes(
+                    plan, checkpoint, channels, writes, config, step + 1
+                )
 
                 if self.debug:
-                    print_step_start(step, next_tasks)
+                    print_checkpoint(step, channels)
 
-                # collect all writes to channels, without applying them yet
-                pending_writes = deque[tuple[str, Any]]()
+                if stream_mode == "tasks":
+                    if task_output := map_task_output(output, writes):
+                        yield {"node": name, "step": step, "writes": task_output}
+                # yield current value and checkpoint view
+                elif step_output := map_output(output, writes, channels):
+                    yield step_output
+                    # we can detect updates when output is multiple channels (ie. dict)
+                    if not isinstance(output, str):
+                        # if view was updated, apply writes to channels
+                        updated |= _apply_writes_from_view(
+                            checkpoint, channels, step_output
+                        )
 
-                # prepare tasks with config
-                tasks_w_config = [
-                    (
-                        proc,
-                        input,
-                        patch_config(
-                            config,
-                            run_name=name,
-                            callbacks=run_manager.get_child(f"graph:step:{step}"),
-                            configurable={
-                                # deque.extend is thread-safe
-                                CONFIG_KEY_SEND: pending_writes.extend,
-                                CONFIG_KEY_READ: read,
-                            },
+                # save end of step checkpoint
+                if self.saver is not None and self.saver.at == CheckpointAt.END_OF_STEP:
+                    self._put_checkpoint(
+                        config, checkpoint, channels, saved_versions, writer
+                    )
+
+                # start the nodes triggered by these writes, including this one
+                # if it was triggered while running
+                launch(updated | plan.nodes[name].triggers, step + 1)
+
+    async def _arelaxed_steps(
+        self,
+        plan: ExecutionPlan,
+        checkpoint: Checkpoint,
+        channels: Mapping[str, BaseChannel],
+        updated_channels: Optional[set[str]],
+        read: Callable[[str], Any],
+        do_stream: bool,
+        run_manager: AsyncCallbackManagerForChainRun,
+        config: RunnableConfig,
+        output: Union[str, Sequence[str]],
+        stream_mode: StreamMode,
+        run_deadline: Optional[float],
+        saved_versions: dict[str, int],
+        writer: Optional[AsyncCheckpointWriter],
+    ) -> AsyncIterator[Union[dict[str, Any], Any]]:
+        """Execute tasks without a barrier between steps, see relaxed_barrier."""
+        # running tasks, with the node name, step and writes of each
+        inflight: dict[asyncio.Task[Any], tuple[str, int, deque[tuple[str, Any]]]] = {}
+
+        def launch(updated: Optional[set[str]], step: int) -> None:
+            if step >= config["recursion_limit"]:
+                return
+
+            next_tasks = _prepare_next_tasks(
+                plan,
+                checkpoint,
+                channels,
+                updated,
+                {name for name, _, _ in inflight.values()},
+            )
+
+            if self.debug and next_tasks:
+                print_step_start(step, next_tasks)
+
+            for proc, input, name in next_tasks:
+                # each task collects its own writes, applied as soon as it finishes
+                writes = deque[tuple[str, Any]]()
+                task_config = patch_config(
+                    config,
+                    run_name=name,
+                    callbacks=run_manager.get_child(f"graph:step:{step}"),
+                    configurable={
+                        CONFIG_KEY_SEND: writes.extend,
+                        CONFIG_KEY_READ: read,
+                    },
+                )
+                node = plan.nodes[name].proc
+                task = asyncio.create_task(
+                    _with_timeout(
+                        arun_with_retry(
+                            proc, input, task_config, node.retry_policy, do_stream
                         ),
+                        node.timeout,
                     )
-                    for proc, input, name in next_tasks
-                ]
+                )
+                inflight[task] = (name, step, writes)
 
-                # execute tasks, and wait for one to fail or all to finish.
-                # each task is independent from all other concurrent tasks
-                done, inflight = await asyncio.wait(
-                    [
-                        asyncio.create_task(_aconsume(proc.astream(input, config)))
-                        for proc, input, config in tasks_w_config
-                    ]
-                    if do_stream
-                    else [
-                        asyncio.create_task(proc.ainvoke(input, config))
-                        for proc, input, config in tasks_w_config
-                    ],
-                    return_when=asyncio.FIRST_EXCEPTION,
-                    timeout=self.step_timeout,
+        launch(updated_channels, 0)
+
+        while inflight:
+            # wait for the next task to finish
+            done, _ = await asyncio.wait(
+                inflight,
+                return_when=asyncio.FIRST_COMPLETED,
+                timeout=_remaining(
+                    _earliest(_deadline(self.step_timeout), run_deadline)
+                ),
+            )
+
+            # interrupt on failure or timeout
+            if not done or any(task.exception() for task in done):
+                _interrupt_or_proceed(
+                    set(done),
+                    set(inflight).difference(done),
+                    min(step for _, step, _ in inflight.values()),
                 )
 
-                # interrupt on failure or timeout
-                _interrupt_or_proceed(done, inflight, step)
+            for task in done:
+                name, step, writes = inflight.pop(task)
 
-                # apply writes to channels
-                _apply_writes(checkpoint, channels, pending_writes, config, step + 1)
+                # apply writes of this task to channels
+                updated = _apply_writes(
+                    plan, checkpoint, channels, writes, config, step + 1
+                )
 
                 if self.debug:
                     print_checkpoint(step, channels)
 
+                if stream_mode == "tasks":
+                    if task_output := map_task_output(output, writes):
+                        yield {"node": name, "step": step, "writes": task_output}
                 # yield current value and checkpoint view
-                if step_output := map_output(output, pending_writes, channels):
+                elif step_output := map_output(output, writes, channels):
                     yield step_output
                     # we can detect updates when output is multiple channels (ie. dict)
                     if not isinstance(output, str):
                         # if view was updated, apply writes to channels
-                        _apply_writes_from_view(checkpoint, channels, step_output)
+                        updated |= _apply_writes_from_view(
+                            checkpoint, channels, step_output
+                        )
 
                 # save end of step checkpoint
                 if self.saver is not None and self.saver.at == CheckpointAt.END_OF_STEP:
-                    checkpoint = create_checkpoint(checkpoint, channels)
-                    await self.saver.aput(config, checkpoint)
+                    await self._aput_checkpoint(
+                        config, checkpoint, channels, saved_versions, writer
+                    )
+
+                # start the nodes triggered by these writes, including this one
+                # if it was triggered while running
+                launch(updated | plan.nodes[name].triggers, step + 1)
+
+    def _batch(
+        self,
+        inputs: list[Union[dict[str, Any], Any]],
+        run_manager: list[CallbackManagerForChainRun],
+        config: list[RunnableConfig],
+        *,
+        output: Union[str, Sequence[str]],
+        return_exceptions: bool = False,
+    ) -> list[Union[dict[str, Any], Any, Exception]]:
+        plan = self._plan
+        run_deadline = _deadline(self.run_timeout)
+        runs = [_BatchRun(rm, c) for rm, c in zip(run_manager, config)]
+        for run in runs:
+            if run.config["recursion_limit"] < 1:
+                run.fail(ValueError("recursion_limit must be at least 1"))
+        # get checkpoints from saver, or create empty ones
+        saved = [
+            self.saver.get(run.config) if self.saver and run.active else None
+            for run in runs
+        ]
+        with ExitStack() as stack, self._get_executor(
+            config[0]
+        ) as executor, self._checkpoint_writer() as writer:
+            for run, input, checkpoint in zip(runs, inputs, saved):
+                if not run.active:
+                    continue
+                run.checkpoint = (
+                    copy_checkpoint(checkpoint) if checkpoint else empty_checkpoint()
+                )
+                run.saved_versions = _saved_versions(run.config, checkpoint)
+                # create channels from checkpoint
+                run.channels = stack.enter_context(
+                    ChannelsManager(self.channels, run.checkpoint)
+                )
+                # map inputs to channel updates
+                run.updated_channels = _apply_writes(
+                    plan,
+                    run.checkpoint,
+                    run.channels,
+                    deque(map_input(self.input, input)),
+                    run.config,
+                    0,
+                )
+                # a saved checkpoint can have nodes left pending by a previous run,
+                # so in the first step every node is a candidate
+                if checkpoint is not None:
+                    run.updated_channels = None
+
+            # All inputs advance through steps in lockstep, and tasks for the same
+            # node in the same step are executed together with node.batch()
+            for step in range(max(run.config["recursion_limit"] for run in runs)):
+                tasks_by_node = self._prepare_batch_tasks(plan, runs, step)
+
+                # if no more tasks, we're done
+                if not tasks_by_node:
+                    break
+
+                # don't start a step if the budget for the run is spent
+                _check_budget(run_deadline, step)
+
+                # execute tasks, and wait for one to fail or all to finish.
+                # each node's batch is independent from all other concurrent batches
+                futures: dict[concurrent.futures.Future[Any], list[Any]] = {}
+                deadlines: dict[concurrent.futures.Future[Any], Optional[float]] = {}
+                for name, tasks in tasks_by_node.items():
+                    node = plan.nodes[name]
+                    fut = executor.submit(
+                        batch_with_retry,
+                        node.runnable,
+                        [input for _, input, _ in tasks],
+                        [config for _, _, config in tasks],
+                        node.proc.retry_policy,
+                    )
+                    futures[fut] = tasks
+                    deadlines[fut] = _deadline(node.proc.timeout)
+                done, inflight = _wait(
+                    deadlines,
+                    _earliest(_deadline(self.step_timeout), run_deadline),
+                    concurrent.futures.FIRST_EXCEPTION,
+                )
+
+                # interrupt on failure or timeout
+                _interrupt_or_proceed(done, inflight, step)
+
+                # fail inputs for which any task raised
+                for fut, tasks in futures.items():
+                    for (run, _, _), result in zip(tasks, fut.result()):
+                        if isinstance(result, Exception):
+                            if not return_exceptions:
+                                raise result
+                            run.fail(result)
+
+                # apply writes to channels
+                for run in runs:
+                    if run.active and run.pending_writes is not None:
+                        self._finish_batch_step(plan, run, output, step)
+                        # save end of step checkpoint
+                        if (
+                            self.saver is not None
+                            and self.saver.at == CheckpointAt.END_OF_STEP
+                        ):
+                            self._put_checkpoint(
+                                run.config,
+                                run.checkpoint,
+                                run.channels,
+                                run.saved_versions,
+                                writer,
+                            )
+
+            # save end of run checkpoint
+            if self.saver is not None and self.saver.at == CheckpointAt.END_OF_RUN:
+                for run in runs:
+                    if run.checkpoint is not None and run.error is None:
+                        self._put_checkpoint(
+                            run.config,
+                            run.checkpoint,
+                            run.channels,
+                            run.saved_versions,
+                            writer,
+                        )
+
+            # wait for checkpoints saved in the background
+            if writer is not None:
+                writer.flush()
+
+        return [run.error if run.error is not None else run.latest for run in runs]
+
+    async def _abatch(
+        self,
+        inputs: list[Union[dict[str, Any], Any]],
+        run_manager: list[AsyncCallbackManagerForChainRun],
+        config: list[RunnableConfig],
+        *,
+        output: Union[str, Sequence[str]],
+        return_exceptions: bool = False,
+    ) -> list[Union[dict[str, Any], Any, Exception]]:
+        plan = self._plan
+        run_deadline = _deadline(self.run_timeout)
+        runs = [_BatchRun(rm, c) for rm, c in zip(run_manager, config)]
+        for run in runs:
+            if run.config["recursion_limit"] < 1:
+                run.fail(ValueError("recursion_limit must be at least 1"))
+        # get checkpoints from saver, or create empty ones
+        saved = [
+            await self.saver.aget(run.config) if self.saver and run.active else None
+            for run in runs
+        ]
+        async with AsyncExitStack() as stack, self._acheckpoint_writer() as writer:
+            for run, input, checkpoint in zip(runs, inputs, saved):
+                if not run.active:
+                    continue
+                run.checkpoint = (
+                    copy_checkpoint(checkpoint) if checkpoint else empty_checkpoint()
+                )
+                run.saved_versions = _saved_versions(run.config, checkpoint)
+                # create channels from checkpoint
+                run.channels = await stack.enter_async_context(
+                    AsyncChannelsManager(self.channels, run.checkpoint)
+                )
+                # map inputs to channel updates
+                run.updated_channels = _apply_writes(
+                    plan,
+                    run.checkpoint,
+                    run.channels,
+                    deque(map_input(self.input, input)),
+                    run.config,
+                    0,
+                )
+                # a saved checkpoint can have nodes left pending by a previous run,
+                # so in the first step every node is a candidate
+                if checkpoint is not None:
+                    run.updated_channels = None
+
+            # All inputs advance through steps in lockstep, and tasks for the same
+            # node in the same step are executed together with node.abatch()
+            for step in range(max(run.config["recursion_limit"] for run in runs)):
+                tasks_by_node = self._prepare_batch_tasks(plan, runs, step)
+
+                # if no more tasks, we're done
+                if not tasks_by_node:
+                    break
+
+                # don't start a step if the budget for the run is spent
+                _check_budget(run_deadline, step)
+
+                # execute tasks, and wait for one to fail or all to finish.
+                # each node's batch is independent from all other concurrent batches
+                futures = {
+                    asyncio.create_task(
+                        _with_timeout(
+                            abatch_with_retry(
+                                plan.nodes[name].runnable,
+                                [input for _, input, _ in tasks],
+                                [config for _, _, config in tasks],
+                                plan.nodes[name].proc.retry_policy,
+                            ),
+                            plan.nodes[name].proc.timeout,
+                        )
+                    ): tasks
+                    for name, tasks in tasks_by_node.items()
+                }
+                done, inflight = await asyncio.wait(
+                    futures,
+                    return_when=asyncio.FIRST_EXCEPTION,
+                    timeout=_remaining(
+                        _earliest(_deadline(self.step_timeout), run_deadline)
+                    ),
+                )
+
+                # interrupt on failure or timeout
+                _interrupt_or_proceed(done, inflight, step)
+
+                # fail inputs for which any task raised
+                for fut, tasks in futures.items():
+                    for (run, _, _), result in zip(tasks, fut.result()):
+                        if isinstance(result, Exception):
+                            if not return_exceptions:
+                                raise result
+                            run.fail(result)
+
+                # apply writes to channels
+                for run in runs:
+                    if run.active and run.pending_writes is not None:
+                        self._finish_batch_step(plan, run, output, step)
+                        # save end of step checkpoint
+                        if (
+                            self.saver is not None
+                            and self.saver.at == CheckpointAt.END_OF_STEP
+                        ):
+                            await self._aput_checkpoint(
+                                run.config,
+                                run.checkpoint,
+                                run.channels,
+                                run.saved_versions,
+                                writer,
+                            )
 
             # save end of run checkpoint
             if self.saver is not None and self.saver.at == CheckpointAt.END_OF_RUN:
-                checkpoint = create_checkpoint(checkpoint, channels)
-                await self.saver.aput(config, checkpoint)
+                for run in runs:
+                    if run.checkpoint is not None and run.error is None:
+                        await self._aput_checkpoint(
+                            run.config,
+                            run.checkpoint,
+                            run.channels,
+                            run.saved_versions,
+                            writer,
+                        )
+
+            # wait for checkpoints saved in the background
+            if writer is not None:
+                await writer.flush()
+
+        return [run.error if run.error is not None else run.latest for run in runs]
+
+    def _prepare_batch_tasks(
+        self, plan: ExecutionPlan, runs: Sequence[_BatchRun], step: int
+    ) -> dict[str, list[tuple[_BatchRun, Any, RunnableConfig]]]:
+        """Prepare the next tasks of each input, grouped by node name."""
+        tasks_by_node: dict[str, list[tuple[_BatchRun, Any, RunnableConfig]]] = {}
+        for run in runs:
+            run.pending_writes = None
+            if not run.active:
+                continue
+            if step >= run.config["recursion_limit"]:
+                run.active = False
+                continue
+
+            next_tasks = _prepare_next_tasks(
+                plan, run.checkpoint, run.channels, run.updated_channels
+            )
+
+            # if no more tasks, this input is done
+            if not next_tasks:
+                run.active = False
+                continue
+
+            if self.debug:
+                print_step_start(step, next_tasks)
+
+            # collect all writes to channels, without applying them yet
+            pending_writes = run.pending_writes = deque[tuple[str, Any]]()
+            read = partial(_read_channel, run.channels)
+
+            # prepare tasks with config
+            for proc, input, name in next_tasks:
+                tasks_by_node.setdefault(name, []).append(
+                    (
+                        run,
+                        input,
+                        patch_config(
+                            run.config,
+                            run_name=name,
+                            callbacks=run.run_manager.get_child(f"graph:step:{step}"),
+                            configurable={
+                                # deque.extend is thread-safe
+                                CONFIG_KEY_SEND: pending_writes.extend,
+                                CONFIG_KEY_READ: read,
+                            },
+                        ),
+                    )
+                )
+        return tasks_by_node
+
+    def _finish_batch_step(
+        self,
+        plan: ExecutionPlan,
+        run: _BatchRun,
+        output: Union[str, Sequence[str]],
+        step: int,
+    ) -> None:
+        """Apply the writes of one input at the end of a step."""
+        assert run.pending_writes is not None
+        run.updated_channels = _apply_writes(
+            plan,
+            run.checkpoint,
+            run.channels,
+            run.pending_writes,
+            run.config,
+            step + 1,
+        )
+
+        if self.debug:
+            print_checkpoint(step, run.channels)
+
+        # keep the latest output, like invoke() does
+        if step_output := map_output(output, run.pending_writes, run.channels):
+            run.latest = step_output
+
+    def batch(
+        self,
+        inputs: list[Union[dict[str, Any], Any]],
+        config: Optional[Union[RunnableConfig, list[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        output: Optional[Union[str, Sequence[str]]] = None,
+        **kwargs: Any,
+    ) -> list[Union[dict[str, Any], Any]]:
+        if not inputs:
+            return []
+
+        return self._batch_with_config(
+            partial(
+                self._batch,
+                output=output if output is not None else self.output,
+                return_exceptions=return_exceptions,
+            ),
+            inputs,
+            config,
+            return_exceptions=return_exceptions,
+            **kwargs,
+        )
+
+    async def abatch(
+        self,
+        inputs: list[Union[dict[str, Any], Any]],
+        config: Optional[Union[RunnableConfig, list[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        output: Optional[Union[str, Sequence[str]]] = None,
+        **kwargs: Any,
+    ) -> list[Union[dict[str, Any], Any]]:
+        if not inputs:
+            return []
+
+        return await self._abatch_with_config(
+            partial(
+                self._abatch,
+                output=output if output is not None else self.output,
+                return_exceptions=return_exceptions,
+            ),
+            inputs,
+            config,
+            return_exceptions=return_exceptions,
+            **kwargs,
+        )
 
     def invoke(
         self,
@@ -460,26 +1409,38 @@ class Pregel(
             latest = chunk
         return latest
 
-    def stream(
+    def stream(  # type: ignore[override]
         self,
         input: Union[dict[str, Any], Any],
         config: Optional[RunnableConfig] = None,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
         **kwargs: Any,
     ) -> Iterator[Union[dict[str, Any], Any]]:
-        return self.transform(iter([input]), config, output=output, **kwargs)
+        """Stream the output of each step, or with stream_mode="tasks" the writes
+        of each task as soon as it finishes, as dicts with the keys "node", "step"
+        and "writes", a list of (channel, value) for the output channels."""
+        return self.transform(
+            iter([input]), config, output=output, stream_mode=stream_mode, **kwargs
+        )
 
-    def transform(
+    def transform(  # type: ignore[override]
         self,
         input: Iterator[Union[dict[str, Any], Any]],
         config: Optional[RunnableConfig] = None,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
         **kwargs: Any,
     ) -> Iterator[Union[dict[str, Any], Any]]:
         for chunk in self._transform_stream_with_config(
-            input, self._transform, config, output=output, **kwargs
+            input,
+            self._transform,
+            config,
+            output=output,
+            stream_mode=stream_mode,
+            **kwargs,
         ):
             yield chunk
 
@@ -501,36 +1462,72 @@ class Pregel(
             latest = chunk
         return latest
 
-    async def astream(
+    async def astream(  # type: ignore[override]
         self,
         input: Union[dict[str, Any], Any],
         config: Optional[RunnableConfig] = None,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
         **kwargs: Any,
     ) -> AsyncIterator[Union[dict[str, Any], Any]]:
+        """Stream the output of each step, or with stream_mode="tasks" the writes
+        of each task as soon as it finishes, as dicts with the keys "node", "step"
+        and "writes", a list of (channel, value) for the output channels."""
+
         async def input_stream() -> AsyncIterator[Union[dict[str, Any], Any]]:
             yield input
 
         async for chunk in self.atransform(
-            input_stream(), config, output=output, **kwargs
+            input_stream(), config, output=output, stream_mode=stream_mode, **kwargs
         ):
             yield chunk
 
-    async def atransform(
+    async def atransform(  # type: ignore[override]
         self,
         input: AsyncIterator[Union[dict[str, Any], Any]],
         config: Optional[RunnableConfig] = None,
         *,
         output: Optional[Union[str, Sequence[str]]] = None,
+        stream_mode: StreamMode = "values",
         **kwargs: Any,
     ) -> AsyncIterator[Union[dict[str, Any], Any]]:
         async for chunk in self._atransform_stream_with_config(
-            input, self._atransform, config, output=output, **kwargs
+            input,
+            self._atransform,
+            config,
+            output=output,
+            stream_mode=stream_mode,
+            **kwargs,
         ):
             yield chunk
 
 
+class _BatchRun:
+    """State of one input of a batch, across steps."""
+
+    checkpoint: Checkpoint
+    channels: Mapping[str, BaseChannel]
+    updated_channels: Optional[set[str]]
+    saved_versions: dict[str, int]
+    pending_writes: Optional[deque[tuple[str, Any]]] = None
+    latest: Union[dict[str, Any], Any] = None
+    error: Optional[Exception] = None
+
+    def __init__(
+        self,
+        run_manager: Union[CallbackManagerForChainRun, AsyncCallbackManagerForChainRun],
+        config: RunnableConfig,
+    ) -> None:
+        self.run_manager = run_manager
+        self.config = config
+        self.active = True
+
+    def fail(self, error: Exception) -> None:
+        self.error = error
+        self.active = False
+
+
 def _interrupt_or_proceed(
     done: Union[set[concurrent.futures.Future[Any]], set[asyncio.Task[Any]]],
     inflight: Union[set[concurrent.futures.Future[Any]], set[asyncio.Task[Any]]],
@@ -542,9 +1539,9 @@ def _interrupt_or_proceed(
             # cancel all pending tasks
             while inflight:
                 inflight.pop().cancel()
-            # raise the exception
+            # raise the exception, tasks with a retry policy have already
+            # been retried by the time they get here
             raise exc
-            # TODO this is where retry of an entire step would happen
 
     if inflight:
         # if we got here means we timed out
@@ -555,6 +1552,131 @@ def _interrupt_or_proceed(
         raise TimeoutError(f"Timed out at step {step}")
 
 
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    """The monotonic time at which a timeout starting now expires, if any."""
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def _earliest(*deadlines: Optional[float]) -> Optional[float]:
+    return min((d for d in deadlines if d is not None), default=None)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _check_budget(run_deadline: Optional[float], step: int) -> None:
+    if run_deadline is not None and time.monotonic() >= run_deadline:
+        raise TimeoutError(f"Run timed out before step {step}")
+
+
+def _wait(
+    fs: Mapping[concurrent.futures.Future[Any], Optional[float]],
+    deadline: Optional[float],
+    return_when: str,
+) -> tuple[set[concurrent.futures.Future[Any]], set[concurrent.futures.Future[Any]]]:
+    """Like concurrent.futures.wait(), for a mapping of futures to their own
+    deadlines, returning early once any pending future or the overall deadline
+    has expired."""
+    done: set[concurrent.futures.Future[Any]] = set()
+    pending = set(fs)
+    while True:
+        next_deadline = _earliest(deadline, *(fs[f] for f in pending))
+        newly_done, pending = concurrent.futures.wait(
+            pending, timeout=_remaining(next_deadline), return_when=return_when
+        )
+        done |= newly_done
+        if not pending:
+            break
+        if return_when == concurrent.futures.FIRST_COMPLETED and newly_done:
+            break
+        if return_when == concurrent.futures.FIRST_EXCEPTION and any(
+            f.exception() for f in newly_done
+        ):
+            break
+        # some future, or the wait itself, has run out of time
+        now = time.monotonic()
+        if (deadline is not None and now >= deadline) or any(
+            fs[f] is not None and cast(float, fs[f]) <= now for f in pending
+        ):
+            break
+    return done, pending
+
+
+def _completed(
+    fs: Mapping[concurrent.futures.Future[Any], Optional[float]],
+    deadline: Optional[float],
+    step: int,
+) -> Iterator[concurrent.futures.Future[Any]]:
+    """Yield futures as they finish, interrupting all of them as soon as one
+    fails or times out. fs maps each future to its own deadline, if any."""
+    pending = dict(fs)
+    while pending:
+        done, _ = _wait(pending, deadline, concurrent.futures.FIRST_COMPLETED)
+        # interrupt on failure or timeout
+        if not done or any(fut.exception() for fut in done):
+            _interrupt_or_proceed(set(done), set(pending).difference(done), step)
+        for fut in done:
+            del pending[fut]
+            yield fut
+
+
+async def _acompleted(
+    tasks: Collection[asyncio.Task[Any]],
+    deadline: Optional[float],
+    step: int,
+) -> AsyncIterator[asyncio.Task[Any]]:
+    """Yield tasks as they finish, interrupting all of them as soon as one
+    fails or the deadline expires."""
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(
+            pending, return_when=asyncio.FIRST_COMPLETED, timeout=_remaining(deadline)
+        )
+        # interrupt on failure or timeout
+        if not done or any(task.exception() for task in done):
+            _interrupt_or_proceed(done, pending, step)
+        for task in done:
+            yield task
+
+
+async def _with_timeout(aw: Awaitable[Any], timeout: Optional[float]) -> Any:
+    """Await with an optional timeout, raising the builtin TimeoutError."""
+    if timeout is None:
+        return await aw
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timed out after {timeout}s")
+
+
+def _saved_versions(
+    config: RunnableConfig, saved: Optional[Checkpoint]
+) -> dict[str, int]:
+    """Channel versions of the checkpoint restored, to save deltas against. Empty
+    when it isn't the latest of the thread, ie. resuming from an earlier one, as
+    deltas are applied to the latest, so the first save is then a full one."""
+    if saved is None or config["configurable"].get("thread_ts"):
+        return {}
+    return dict(saved["channel_versions"])
+
+
+def _changed_channels(
+    plan: ExecutionPlan,
+    checkpoint: Checkpoint,
+    channels: Mapping[str, BaseChannel],
+    saved_versions: Mapping[str, int],
+) -> list[str]:
+    """Names of channels whose value may have changed since saved_versions. Channels
+    notified of steps can change without a new version, so are always included."""
+    return [
+        chan
+        for chan in channels
+        if chan in plan.step_channels
+        or checkpoint["channel_versions"].get(chan, 0) > saved_versions.get(chan, 0)
+    ]
+
+
 def _read_channel(
     channels: Mapping[str, BaseChannel], chan: str, catch: bool = True
 ) -> Any:
@@ -565,16 +1687,18 @@ def _read_channel(
 
 
 def _apply_writes(
+    plan: ExecutionPlan,
     checkpoint: Checkpoint,
     channels: Mapping[str, BaseChannel],
     pending_writes: Sequence[tuple[str, Any]],
     config: RunnableConfig,
     for_step: int,
-) -> None:
+) -> set[str]:
+    """Apply pending writes to channels, returning the names of updated channels."""
     pending_writes_by_channel: dict[str, list[Any]] = defaultdict(list)
     # Group writes by channel
     for chan, val in pending_writes:
-        if chan in [c.value for c in ReservedChannels]:
+        if chan in plan.reserved:
             raise ValueError(f"Can't write to reserved channel {chan}")
         pending_writes_by_channel[chan].append(val)
 
@@ -592,15 +1716,20 @@ def _apply_writes(
             updated_channels.add(chan)
         else:
             logger.warning(f"Skipping write for channel {chan} which has no readers")
-    # Channels that weren't updated in this step are notified of a new step
-    for chan in channels:
+    # Channels that weren't updated in this step are notified of a new step,
+    # skipping those that don't need to be
+    for chan in plan.step_channels:
         if chan not in updated_channels:
             channels[chan].update([])
 
+    return updated_channels
+
 
 def _apply_writes_from_view(
     checkpoint: Checkpoint, channels: Mapping[str, BaseChannel], values: dict[str, Any]
-) -> None:
+) -> set[str]:
+    """Apply changes made to an output view, returning the names of updated channels."""
+    updated_channels: set[str] = set()
     for chan, value in values.items():
         if value == channels[chan].get():
             continue
@@ -611,51 +1740,70 @@ def _apply_writes_from_view(
         )
         checkpoint["channel_versions"][chan] += 1
         channels[chan].update([values[chan]])
+        updated_channels.add(chan)
+
+    return updated_channels
 
 
 def _prepare_next_tasks(
+    plan: ExecutionPlan,
     checkpoint: Checkpoint,
-    processes: Mapping[str, Union[ChannelInvoke, ChannelBatch]],
     channels: Mapping[str, BaseChannel],
+    updated_channels: Optional[set[str]],
+    running: Container[str] = (),
 ) -> list[tuple[Runnable, Any, str]]:
     tasks: list[tuple[Runnable, Any, str]] = []
+    # Only processes subscribed to a channel updated in the last step can run,
+    # unless updated_channels is None, in which case all processes are checked
+    candidates = (
+        plan.nodes
+        if updated_channels is None
+        else dict.fromkeys(
+            name for chan in updated_channels for name in plan.subscribers.get(chan, ())
+        )
+    )
     # Check if any processes should be run in next step
     # If so, prepare the values to be passed to them
-    for name, proc in processes.items():
+    for name in candidates:
+        # processes still running are checked again once they finish
+        if name in running:
+            continue
+        node = plan.nodes[name]
+        proc = node.proc
         seen = checkpoint["versions_seen"][name]
         if isinstance(proc, ChannelInvoke):
             # If any of the channels read by this process were updated
             if any(
                 checkpoint["channel_versions"][chan] > seen[chan]
-                for chan in proc.triggers
+                for chan in node.triggers
             ):
                 # If all channels subscribed by this process have been initialized
                 try:
                     val: Any = {
                         k: _read_channel(
-                            channels, chan, catch=chan not in proc.triggers
+                            channels, chan, catch=chan not in node.triggers
                         )
-                        for k, chan in proc.channels.items()
+                        for k, chan in node.reads
                     }
                 except EmptyChannelError:
                     continue
 
                 # Processes that subscribe to a single keyless channel get
                 # the value directly, instead of a dict
-                if list(proc.channels.keys()) == [None]:
+                if node.keyless:
                     val = val[None]
 
                 # update seen versions
                 seen.update(
                     {
                         chan: checkpoint["channel_versions"][chan]
-                        for chan in proc.triggers
+                        for chan in node.triggers
                     }
                 )
 
                 # skip if condition is not met
                 if proc.when is None or proc.when(val):
-                    tasks.append((proc, val, name))
+                    tasks.append((node.runnable, val, name))
         elif isinstance(proc, ChannelBatch):
             # If the channel read by this process was updated
             if checkpoint["channel_versions"][proc.channel] > seen[proc.channel]:
@@ -665,13 +1813,7 @@ def _prepare_next_tasks(
                 if proc.key is not None:
                     val = [{proc.key: v} for v in val]
 
-                tasks.append((proc, val, name))
+                tasks.append((node.runnable, val, name))
                 seen[proc.channel] = checkpoint["channel_versions"][proc.channel]
 
     return tasks
-
-
-async def _aconsume(iterator: AsyncIterator[Any]) -> None:
-    """Consume an async iterator."""
-    async for _ in iterator:
-        pass
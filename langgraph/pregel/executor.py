@@ -0,0 +1,41 @@
+import threading
+from typing import Optional
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+_worker_of = threading.local()
+
+
+class PregelExecutor(ContextThreadPoolExecutor):
+    """A long-lived thread pool, to be shared by all invocations of one or more
+    Pregel instances, instead of creating a new one for each invocation.
+
+    The pool size bounds the number of tasks running at once across all
+    invocations using it. Call shutdown() (or use it as a context manager) to
+    wait for running tasks and release its threads.
+
+    ```python
+    executor = PregelExecutor(max_concurrency=16)
+    app = Pregel(nodes=..., executor=executor)
+    ...
+    executor.shutdown()
+    ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        thread_name_prefix: str = "pregel",
+    ) -> None:
+        super().__init__(
+            max_workers=max_concurrency,
+            thread_name_prefix=thread_name_prefix,
+            initializer=self._register_worker,
+        )
+
+    def _register_worker(self) -> None:
+        _worker_of.executor = self
+
+    def in_worker(self) -> bool:
+        """Whether the current thread is one of this pool's workers."""
+        return getattr(_worker_of, "executor", None) is self
@@ -36,3 +36,15 @@ def map_output(
         if updated := {c for c, _ in pending_writes if c in output_channels}:
             return {chan: channels[chan].get() for chan in updated}
     return None
+
+
+def map_task_output(
+    output_channels: Union[str, Sequence[str]],
+    task_writes: Sequence[tuple[str, Any]],
+) -> Optional[list[tuple[str, Any]]]:
+    """Map the writes of a single task to the writes to output channels, if any."""
+    if isinstance(output_channels, str):
+        writes = [(c, v) for c, v in task_writes if c == output_channels]
+    else:
+        writes = [(c, v) for c, v in task_writes if c in output_channels]
+    return writes or None
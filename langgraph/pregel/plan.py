@@ -0,0 +1,148 @@
+from collections import defaultdict
+from concurrent.futures import Executor
+from typing import (
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.base import (
+    RunnableBindingBase,
+    RunnableEachBase,
+    RunnableParallel,
+    RunnableSequence,
+)
+from langchain_core.runnables.passthrough import RunnableAssign
+
+from langgraph.channels.base import BaseChannel
+from langgraph.pregel.process import ProcessNode
+from langgraph.pregel.read import ChannelBatch, ChannelInvoke, ChannelRead
+from langgraph.pregel.reserved import ReservedChannels
+from langgraph.pregel.write import ChannelWrite
+
+R = TypeVar("R", bound=Runnable)
+
+
+class NodePlan(NamedTuple):
+    """Facts about a node that don't change between steps or invocations."""
+
+    proc: Union[ChannelInvoke, ChannelBatch]
+
+    runnable: Runnable
+    """What to execute when the node is triggered, usually proc itself."""
+
+    triggers: frozenset[str]
+    """Channels that trigger the node when updated."""
+
+    reads: tuple[tuple[Optional[str], str], ...]
+    """Pairs of (key, channel) read to build the node's input."""
+
+    keyless: bool
+    """Whether the node reads a single keyless channel, and gets its value directly."""
+
+
+class ExecutionPlan(NamedTuple):
+    """Everything a Pregel invocation needs to know about the graph, computed once
+    per Pregel instance and shared by all its invocations."""
+
+    nodes: Mapping[str, NodePlan]
+
+    subscribers: Mapping[str, tuple[str, ...]]
+    """Mapping of channel name to the names of nodes triggered by it."""
+
+    step_channels: tuple[str, ...]
+    """Names of channels to notify of steps in which they weren't updated."""
+
+    reserved: frozenset[str]
+    """Names of channels managed by the framework, which nodes can't write to."""
+
+    output: tuple[str, ...]
+    """Default output channels, ie. all channels that aren't hidden."""
+
+    contended: frozenset[str]
+    """Names of channels written to by more than one node, which can't merge writes
+    applied separately. The relaxed barrier mode is only safe if there are none."""
+
+
+def compile_plan(
+    nodes: Mapping[str, Union[ChannelInvoke, ChannelBatch]],
+    channels: Mapping[str, BaseChannel],
+    hidden: Sequence[str],
+    process_executor: Optional[Executor] = None,
+) -> ExecutionPlan:
+    node_plans: dict[str, NodePlan] = {}
+    subscribers: defaultdict[str, list[str]] = defaultdict(list)
+    writers: defaultdict[str, set[str]] = defaultdict(set)
+    for name, proc in nodes.items():
+        runnable: Runnable = proc
+        if proc.run_in_process and process_executor is not None:
+            runnable = ProcessNode(
+                proc,
+                process_executor,
+                list(
+                    dict.fromkeys(r.channel for r in find_runnables(proc, ChannelRead))
+                ),
+            )
+        if isinstance(proc, ChannelInvoke):
+            node_plans[name] = NodePlan(
+                proc=proc,
+                runnable=runnable,
+                triggers=frozenset(proc.triggers),
+                reads=tuple(proc.channels.items()),
+                keyless=list(proc.channels.keys()) == [None],
+            )
+        else:
+            node_plans[name] = NodePlan(
+                proc=proc,
+                runnable=runnable,
+                triggers=frozenset([proc.channel]),
+                reads=((proc.key, proc.channel),),
+                keyless=proc.key is None,
+            )
+        for chan in node_plans[name].triggers:
+            subscribers[chan].append(name)
+        for write in find_runnables(proc, ChannelWrite):
+            for chan, _ in write.channels:
+                writers[chan].add(name)
+
+    return ExecutionPlan(
+        nodes=node_plans,
+        subscribers={chan: tuple(names) for chan, names in subscribers.items()},
+        step_channels=tuple(
+            name for name, chan in channels.items() if chan.notify_on_step
+        ),
+        reserved=frozenset(c.value for c in ReservedChannels),
+        output=tuple(chan for chan in channels if chan not in hidden),
+        contended=frozenset(
+            chan
+            for chan, names in writers.items()
+            if len(names) > 1 and chan in channels and not channels[chan].merges_writes
+        ),
+    )
+
+
+def find_runnables(runnable: Runnable, typ: Type[R]) -> Iterator[R]:
+    """Find all runnables of a given type nested in a runnable, eg. all the
+    ChannelRead instances in a node."""
+    if isinstance(runnable, typ):
+        yield runnable
+    if isinstance(runnable, RunnableSequence):
+        children: Sequence[Runnable] = runnable.steps
+    elif isinstance(runnable, RunnableParallel):
+        children = list(runnable.steps.values())
+    elif isinstance(runnable, (RunnableBindingBase, RunnableEachBase)):
+        children = [runnable.bound]
+    elif isinstance(runnable, RunnableAssign):
+        children = [runnable.mapper]
+    elif isinstance(runnable, ChannelWrite):
+        children = [r for _, r in runnable.channels if r is not None]
+    else:
+        children = []
+    for child in children:
+        yield from find_runnables(child, typ)
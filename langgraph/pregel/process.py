@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Optional, Sequence, cast
+
+from langchain_core.callbacks.manager import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+)
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config, patch_config
+
+from langgraph.constants import CONFIG_KEY_READ, CONFIG_KEY_SEND
+from langgraph.pregel.write import TYPE_SEND
+
+# Config keys that can be shipped to another process, callbacks are left behind
+PICKLABLE_CONFIG_KEYS = ("tags", "metadata", "run_name", "recursion_limit")
+
+
+class ProcessNode(Runnable[Any, None]):
+    """Runs a node in a process pool, eg. a ProcessPoolExecutor, to avoid contention
+    on the GIL for CPU-bound work.
+
+    The node, its input and config (except callbacks) are pickled and sent to a
+    worker process, along with the current value of the channels it reads with
+    ChannelRead, eg. from ChannelBatch.join(). Writes made by the node in the worker
+    are sent back and forwarded to the Pregel process that invoked it.
+    """
+
+    def __init__(
+        self, node: Runnable, executor: Executor, reads: Sequence[str] = ()
+    ) -> None:
+        self.node = node
+        self.executor = executor
+        self.reads = reads
+        self.name = node.get_name()
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None) -> None:
+        return self._call_with_config(self._invoke, input, ensure_config(config))
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> None:
+        return await self._acall_with_config(
+            self._ainvoke, input, ensure_config(config)
+        )
+
+    def _invoke(
+        self,
+        input: Any,
+        run_manager: CallbackManagerForChainRun,
+        config: RunnableConfig,
+    ) -> None:
+        writes = self.executor.submit(
+            run_in_process, self.node, input, *self._prepare(config)
+        ).result()
+        send: TYPE_SEND = config["configurable"][CONFIG_KEY_SEND]
+        send(writes)
+
+    async def _ainvoke(
+        self,
+        input: Any,
+        run_manager: AsyncCallbackManagerForChainRun,
+        config: RunnableConfig,
+    ) -> None:
+        writes = await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            partial(run_in_process, self.node, input, *self._prepare(config)),
+        )
+        send: TYPE_SEND = config["configurable"][CONFIG_KEY_SEND]
+        send(writes)
+
+    def _prepare(self, config: RunnableConfig) -> tuple[RunnableConfig, dict[str, Any]]:
+        read: Callable[[str], Any] = config["configurable"][CONFIG_KEY_READ]
+        configurable = {
+            k: v
+            for k, v in config["configurable"].items()
+            if k not in (CONFIG_KEY_SEND, CONFIG_KEY_READ)
+        }
+        picklable = {k: config[k] for k in PICKLABLE_CONFIG_KEYS if k in config}  # type: ignore[literal-required]
+        picklable["configurable"] = configurable
+        return cast(RunnableConfig, picklable), {
+            chan: read(chan) for chan in self.reads
+        }
+
+
+def run_in_process(
+    node: Runnable, input: Any, config: RunnableConfig, values: dict[str, Any]
+) -> list[tuple[str, Any]]:
+    """Invoke a node in a worker process, returning the writes it made."""
+
+    def read(chan: str) -> Any:
+        try:
+            return values[chan]
+        except KeyError:
+            raise RuntimeError(
+                f"Channel {chan} isn't available to {node.get_name()}, which runs "
+                "in a process. Only channels read with ChannelRead can be accessed."
+            )
+
+    writes: list[tuple[str, Any]] = []
+    node.invoke(
+        input,
+        patch_config(
+            config, configurable={CONFIG_KEY_SEND: writes.extend, CONFIG_KEY_READ: read}
+        ),
+    )
+    return writes
@@ -20,6 +20,7 @@ from langchain_core.runnables.utils import ConfigurableFieldSpec
 
 from langgraph.channels.base import BaseChannel
 from langgraph.constants import CONFIG_KEY_READ
+from langgraph.pregel.retry import RetryPolicy
 
 
 class ChannelRead(RunnableLambda):
@@ -77,6 +78,15 @@ class ChannelInvoke(RunnableBindingBase):
 
     kwargs: Mapping[str, Any] = Field(default_factory=dict)
 
+    run_in_process: bool = False
+    """Whether to run in the Pregel instance's process_executor."""
+
+    retry_policy: Optional[RetryPolicy] = None
+    """How to retry the node when it fails, if at all."""
+
+    timeout: Optional[float] = None
+    """Seconds after which each task of the node times out, including retries."""
+
     def __init__(
         self,
         channels: Mapping[None, str] | Mapping[str, str],
@@ -86,6 +96,9 @@ class ChannelInvoke(RunnableBindingBase):
         bound: Optional[Runnable[Any, Any]] = None,
         kwargs: Optional[Mapping[str, Any]] = None,
         config: Optional[RunnableConfig] = None,
+        run_in_process: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Optional[float] = None,
         **other_kwargs: Any,
     ) -> None:
         super().__init__(
@@ -95,6 +108,9 @@ class ChannelInvoke(RunnableBindingBase):
             bound=bound or default_bound,
             kwargs=kwargs or {},
             config=config,
+            run_in_process=run_in_process,
+            retry_policy=retry_policy,
+            timeout=timeout,
             **other_kwargs,
         )
 
@@ -115,6 +131,9 @@ class ChannelInvoke(RunnableBindingBase):
             bound=self.bound,
             kwargs=self.kwargs,
             config=self.config,
+            run_in_process=self.run_in_process,
+            retry_policy=self.retry_policy,
+            timeout=self.timeout,
         )
 
     def __or__(
@@ -133,6 +152,9 @@ class ChannelInvoke(RunnableBindingBase):
                 bound=coerce_to_runnable(other),
                 kwargs=self.kwargs,
                 config=self.config,
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
             )
         else:
             return ChannelInvoke(
@@ -143,6 +165,9 @@ class ChannelInvoke(RunnableBindingBase):
                 bound=self.bound | other,
                 kwargs=self.kwargs,
                 config=self.config,
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
             )
 
     def __ror__(
@@ -163,6 +188,15 @@ class ChannelBatch(RunnableEach):
 
     bound: Runnable[Any, Any] = Field(default=default_bound)
 
+    run_in_process: bool = False
+    """Whether to run in the Pregel instance's process_executor."""
+
+    retry_policy: Optional[RetryPolicy] = None
+    """How to retry the node when it fails, if at all."""
+
+    timeout: Optional[float] = None
+    """Seconds after which each task of the node times out, including retries."""
+
     def join(self, channels: Sequence[str]) -> ChannelBatch:
         if self.key is None:
             raise ValueError(
@@ -174,10 +208,22 @@ class ChannelBatch(RunnableEach):
             **{chan: ChannelRead(chan) for chan in channels}
         )
         if self.bound is default_bound:
-            return ChannelBatch(channel=self.channel, key=self.key, bound=joiner)
+            return ChannelBatch(
+                channel=self.channel,
+                key=self.key,
+                bound=joiner,
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
+            )
         else:
             return ChannelBatch(
-                channel=self.channel, key=self.key, bound=self.bound | joiner
+                channel=self.channel,
+                key=self.key,
+                bound=self.bound | joiner,
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
             )
 
     def __or__(  # type: ignore[override]
@@ -190,12 +236,22 @@ class ChannelBatch(RunnableEach):
     ) -> ChannelBatch:
         if self.bound is default_bound:
             return ChannelBatch(
-                channel=self.channel, key=self.key, bound=coerce_to_runnable(other)
+                channel=self.channel,
+                key=self.key,
+                bound=coerce_to_runnable(other),
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
             )
         else:
             # delegate to __or__ in self.bound
             return ChannelBatch(
-                channel=self.channel, key=self.key, bound=self.bound | other
+                channel=self.channel,
+                key=self.key,
+                bound=self.bound | other,
+                run_in_process=self.run_in_process,
+                retry_policy=self.retry_policy,
+                timeout=self.timeout,
             )
 
     def __ror__(
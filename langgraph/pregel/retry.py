@@ -0,0 +1,226 @@
+import asyncio
+import random
+import time
+from typing import Any, NamedTuple, Optional, Type, Union
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import patch_config
+
+from langgraph.constants import CONFIG_KEY_SEND
+from langgraph.pregel.log import logger
+
+
+class RetryPolicy(NamedTuple):
+    """Configuration for retrying a node when it raises an exception."""
+
+    max_attempts: int = 3
+    """Maximum number of attempts, including the first one."""
+
+    initial_interval: float = 0.5
+    """Seconds to wait before the first retry."""
+
+    backoff_factor: float = 2.0
+    """Multiplier applied to the interval after each retry."""
+
+    max_interval: float = 128.0
+    """Maximum number of seconds to wait between retries."""
+
+    jitter: bool = True
+    """Whether to add up to one second of random jitter to each interval."""
+
+    retry_on: Union[Type[Exception], tuple[Type[Exception], ...]] = Exception
+    """Exception types to retry on, others are raised immediately."""
+
+
+def retry_interval(retry_policy: RetryPolicy, attempt: int) -> float:
+    """Seconds to wait after a given (1-indexed) failed attempt."""
+    interval = min(
+        retry_policy.max_interval,
+        retry_policy.initial_interval * retry_policy.backoff_factor ** (attempt - 1),
+    )
+    if retry_policy.jitter:
+        interval += random.uniform(0, 1)
+    return interval
+
+
+def run_with_retry(
+    runnable: Runnable,
+    input: Any,
+    config: RunnableConfig,
+    retry_policy: Optional[RetryPolicy],
+) -> None:
+    """Invoke a task, retrying it according to the retry policy, if any.
+
+    The writes of each attempt are only sent once it succeeds, so that a failed
+    attempt leaves no partial writes behind."""
+    if retry_policy is None:
+        runnable.invoke(input, config)
+        return
+
+    send = config["configurable"][CONFIG_KEY_SEND]
+    attempt = 0
+    while True:
+        writes: list[tuple[str, Any]] = []
+        try:
+            runnable.invoke(
+                input,
+                patch_config(config, configurable={CONFIG_KEY_SEND: writes.extend}),
+            )
+        except retry_policy.retry_on as exc:
+            attempt += 1
+            if attempt >= retry_policy.max_attempts:
+                raise
+            interval = retry_interval(retry_policy, attempt)
+            logger.info(
+                f"Retrying {config.get('run_name')} in {interval:.2f}s "
+                f"after attempt {attempt} raised {exc!r}"
+            )
+            time.sleep(interval)
+        else:
+            send(writes)
+            return
+
+
+async def arun_with_retry(
+    runnable: Runnable,
+    input: Any,
+    config: RunnableConfig,
+    retry_policy: Optional[RetryPolicy],
+    stream: bool = False,
+) -> None:
+    """Invoke a task, retrying it according to the retry policy, if any.
+
+    The writes of each attempt are only sent once it succeeds, so that a failed
+    attempt leaves no partial writes behind."""
+    if retry_policy is None:
+        await _ainvoke(runnable, input, config, stream)
+        return
+
+    send = config["configurable"][CONFIG_KEY_SEND]
+    attempt = 0
+    while True:
+        writes: list[tuple[str, Any]] = []
+        try:
+            await _ainvoke(
+                runnable,
+                input,
+                patch_config(config, configurable={CONFIG_KEY_SEND: writes.extend}),
+                stream,
+            )
+        except retry_policy.retry_on as exc:
+            attempt += 1
+            if attempt >= retry_policy.max_attempts:
+                raise
+            interval = retry_interval(retry_policy, attempt)
+            logger.info(
+                f"Retrying {config.get('run_name')} in {interval:.2f}s "
+                f"after attempt {attempt} raised {exc!r}"
+            )
+            await asyncio.sleep(interval)
+        else:
+            send(writes)
+            return
+
+
+def batch_with_retry(
+    runnable: Runnable,
+    inputs: list[Any],
+    configs: list[RunnableConfig],
+    retry_policy: Optional[RetryPolicy],
+) -> list[Any]:
+    """Batch tasks of the same node, retrying those that fail according to the
+    retry policy, if any. Failed tasks are retried together, in a smaller batch.
+    Returns the result or exception of each task."""
+    if retry_policy is None:
+        return runnable.batch(inputs, configs, return_exceptions=True)
+
+    results: list[Any] = [None] * len(inputs)
+    pending = list(range(len(inputs)))
+    attempt = 0
+    while True:
+        writes: list[list[tuple[str, Any]]] = [[] for _ in pending]
+        outcomes = runnable.batch(
+            [inputs[i] for i in pending],
+            [
+                patch_config(configs[i], configurable={CONFIG_KEY_SEND: w.extend})
+                for i, w in zip(pending, writes)
+            ],
+            return_exceptions=True,
+        )
+        attempt += 1
+        pending = _collect_batch(
+            retry_policy, attempt, pending, writes, outcomes, configs, results
+        )
+        if not pending:
+            return results
+        time.sleep(retry_interval(retry_policy, attempt))
+
+
+async def abatch_with_retry(
+    runnable: Runnable,
+    inputs: list[Any],
+    configs: list[RunnableConfig],
+    retry_policy: Optional[RetryPolicy],
+) -> list[Any]:
+    """Batch tasks of the same node, retrying those that fail according to the
+    retry policy, if any. Failed tasks are retried together, in a smaller batch.
+    Returns the result or exception of each task."""
+    if retry_policy is None:
+        return await runnable.abatch(inputs, configs, return_exceptions=True)
+
+    results: list[Any] = [None] * len(inputs)
+    pending = list(range(len(inputs)))
+    attempt = 0
+    while True:
+        writes: list[list[tuple[str, Any]]] = [[] for _ in pending]
+        outcomes = await runnable.abatch(
+            [inputs[i] for i in pending],
+            [
+                patch_config(configs[i], configurable={CONFIG_KEY_SEND: w.extend})
+                for i, w in zip(pending, writes)
+            ],
+            return_exceptions=True,
+        )
+        attempt += 1
+        pending = _collect_batch(
+            retry_policy, attempt, pending, writes, outcomes, configs, results
+        )
+        if not pending:
+            return results
+        await asyncio.sleep(retry_interval(retry_policy, attempt))
+
+
+def _collect_batch(
+    retry_policy: RetryPolicy,
+    attempt: int,
+    pending: list[int],
+    writes: list[list[tuple[str, Any]]],
+    outcomes: list[Any],
+    configs: list[RunnableConfig],
+    results: list[Any],
+) -> list[int]:
+    """Record the outcome of each task of a batch attempt, sending the writes of
+    those that succeeded, and return the indexes of the tasks to retry."""
+    retry: list[int] = []
+    for i, task_writes, outcome in zip(pending, writes, outcomes):
+        if (
+            isinstance(outcome, retry_policy.retry_on)
+            and attempt < retry_policy.max_attempts
+        ):
+            retry.append(i)
+            continue
+        results[i] = outcome
+        if not isinstance(outcome, Exception):
+            configs[i]["configurable"][CONFIG_KEY_SEND](task_writes)
+    return retry
+
+
+async def _ainvoke(
+    runnable: Runnable, input: Any, config: RunnableConfig, stream: bool
+) -> None:
+    if stream:
+        # consume the stream, eg. when running from astream_log()
+        async for _ in runnable.astream(input, config):
+            pass
+    else:
+        await runnable.ainvoke(input, config)
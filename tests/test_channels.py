@@ -17,6 +17,8 @@ def test_last_value() -> None:
     with LastValue(int).empty() as channel:
         assert channel.ValueType is int
         assert channel.UpdateType is int
+        assert not channel.notify_on_step
+        assert not channel.merges_writes
 
         with pytest.raises(EmptyChannelError):
             channel.get()
@@ -55,6 +57,8 @@ def test_topic() -> None:
     with Topic(str).empty() as channel:
         assert channel.ValueType is Sequence[str]
         assert channel.UpdateType is Union[str, list[str]]
+        assert channel.notify_on_step
+        assert not channel.merges_writes
 
         channel.update(["a", "b"])
         assert channel.get() == ["a", "b"]
@@ -131,6 +135,8 @@ def test_topic_accumulate() -> None:
     with Topic(str, accumulate=True).empty() as channel:
         assert channel.ValueType is Sequence[str]
         assert channel.UpdateType is Union[str, list[str]]
+        assert not channel.notify_on_step
+        assert channel.merges_writes
 
         channel.update(["a", "b"])
         assert channel.get() == ["a", "b"]
@@ -181,6 +187,25 @@ def test_topic_unique_accumulate() -> None:
         assert channel.get() == ["a", "b", "c", "d", "e"]
 
 
+def test_topic_checkpoint_copy_on_write() -> None:
+    with Topic(str, unique=True, accumulate=True).empty() as channel:
+        channel.update(["a", "b"])
+        checkpoint = channel.checkpoint()
+        # checkpoints of an unchanged channel share its state
+        assert channel.checkpoint()[1] is checkpoint[1]
+        # which is copied once the channel changes, leaving checkpoints as they were
+        channel.update([])
+        assert channel.checkpoint()[1] is checkpoint[1]
+        channel.update(["c"])
+        assert checkpoint == ({"a", "b"}, ["a", "b"])
+        assert channel.checkpoint() == ({"a", "b", "c"}, ["a", "b", "c"])
+    # restoring from a checkpoint leaves it as it was too
+    with Topic(str, unique=True, accumulate=True).empty(checkpoint) as channel:
+        channel.update(["c"])
+        assert channel.get() == ["a", "b", "c"]
+        assert checkpoint == ({"a", "b"}, ["a", "b"])
+
+
 async def test_topic_unique_accumulate_async() -> None:
     async with Topic(str, unique=True, accumulate=True).aempty() as channel:
         assert channel.ValueType is Sequence[str]
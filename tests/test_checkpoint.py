@@ -0,0 +1,221 @@
+import asyncio
+import threading
+import time
+from typing import Any, Literal, Optional
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    Checkpoint,
+    IOStats,
+    empty_checkpoint,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde import (
+    CompressedSerializer,
+    PickleSerializer,
+    train_zdict,
+)
+
+
+def test_pickle_serializer() -> None:
+    serde = PickleSerializer(out_of_band_threshold=1024)
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {
+        "topic": ({1, 2}, [1, 2]),
+        "pair": (1, "a"),
+        "small": b"x" * 10,
+        "large": b"y" * 2048,
+        "buffer": bytearray(b"z" * 2048),
+    }
+    checkpoint["channel_versions"]["topic"] = 2
+    checkpoint["versions_seen"]["node"]["topic"] = 1
+
+    data = serde.dumps(checkpoint)
+    # the large values are appended after the pickle, uncopied into it
+    assert data.endswith(b"y" * 2048 + b"z" * 2048)
+
+    loaded = serde.loads(data)
+    assert loaded == checkpoint
+    assert isinstance(loaded["channel_values"]["large"], bytes)
+    assert isinstance(loaded["channel_values"]["buffer"], bytearray)
+    # defaultdicts keep their defaults
+    assert loaded["channel_versions"]["other"] == 0
+    assert loaded["versions_seen"]["other"]["topic"] == 0
+    # the checkpoint itself is left as is
+    assert isinstance(checkpoint["channel_values"]["large"], bytes)
+
+    assert serde.loads(serde.dumps(None)) is None
+
+
+def test_compressed_serializer() -> None:
+    messages = [f"message {i}: " + "hello there " * 20 for i in range(50)]
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {
+        "messages": messages,
+        "small": 1,
+        "raw": b"x" * 4096,
+    }
+    checkpoint["channel_versions"]["messages"] = 1
+
+    plain = PickleSerializer().dumps(checkpoint)
+    methods: list[Literal["zlib", "lzma"]] = ["zlib", "lzma"]
+    for method in methods:
+        serde = CompressedSerializer(method=method, skip_channels=["raw"])
+        data = serde.dumps(checkpoint)
+        # the messages are compressed, the skipped channel isn't
+        assert len(data) < len(plain) - 10_000
+        assert b"x" * 4096 in data
+        assert serde.loads(data) == checkpoint
+
+    # values under the threshold are stored as they are
+    serde = CompressedSerializer(threshold=1 << 20)
+    assert len(serde.dumps(checkpoint)) > len(plain)
+    assert serde.loads(serde.dumps(checkpoint)) == checkpoint
+
+    # a trained dictionary helps with small values
+    message = "message 50: " + "hello there " * 20
+    zdict = train_zdict(messages)
+    trained = CompressedSerializer(threshold=0, zdict=zdict)
+    untrained = CompressedSerializer(threshold=0)
+    assert len(trained.dumps(message)) < len(untrained.dumps(message)) - 25
+    assert trained.loads(trained.dumps(message)) == message
+
+    with pytest.raises(ValueError):
+        CompressedSerializer(method="lzma", zdict=zdict)
+
+
+def test_memory_saver_serialize() -> None:
+    memory = MemorySaver(serialize=True, serde=CompressedSerializer(threshold=0))
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"]["messages"] = ["hello there " * 20]
+    memory.put(config, checkpoint)
+    assert isinstance(memory.storage["1"], bytes)
+    assert len(memory.storage["1"]) < len(PickleSerializer().dumps(checkpoint)) - 100
+    assert memory.get(config) == checkpoint
+
+
+def test_memory_saver_bounded() -> None:
+    def config(thread_id: str) -> RunnableConfig:
+        return {"configurable": {"thread_id": thread_id}}
+
+    def checkpoint(value: Any) -> Checkpoint:
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"]["value"] = value
+        return checkpoint
+
+    # least recently used threads are evicted first
+    memory = MemorySaver(max_entries=2)
+    memory.put(config("1"), checkpoint(1))
+    memory.put(config("2"), checkpoint(2))
+    assert memory.get(config("1")) is not None
+    memory.put(config("3"), checkpoint(3))
+    assert list(memory.storage) == ["1", "3"]
+    assert memory.get(config("2")) is None
+    assert (memory.hits, memory.misses, memory.evictions) == (1, 1, 1)
+
+    # by approximate size, keeping the checkpoint just saved
+    memory = MemorySaver(serialize=True, max_bytes=5_000)
+    memory.put(config("1"), checkpoint(b"x" * 2_000))
+    memory.put(config("2"), checkpoint(b"x" * 2_000))
+    assert list(memory.storage) == ["1", "2"]
+    memory.put(config("3"), checkpoint(b"x" * 2_000))
+    assert list(memory.storage) == ["2", "3"]
+    memory.put(config("4"), checkpoint(b"x" * 10_000))
+    assert list(memory.storage) == ["4"]
+    assert memory.evictions == 3
+
+    # threads not used for ttl seconds expire
+    memory = MemorySaver(ttl=0.05)
+    memory.put(config("1"), checkpoint(1))
+    time.sleep(0.1)
+    memory.put(config("2"), checkpoint(2))
+    assert list(memory.storage) == ["2"]
+    assert memory.get(config("1")) is None
+
+    # evicted checkpoints are spilled, and loaded back from there
+    durable = MemorySaver()
+    memory = MemorySaver(max_entries=1, spill=durable, snapshot_interval=3)
+    memory.put(config("1"), checkpoint(1))
+    memory.put_delta(config("1"), checkpoint(10), lambda: checkpoint(10))
+    memory.put(config("2"), checkpoint(2))
+    assert list(durable.storage) == ["1"]
+    assert durable.storage["1"]["channel_values"]["value"] == 10
+    loaded = memory.get(config("1"))
+    assert loaded is not None
+    assert loaded["channel_values"]["value"] == 10
+    assert list(memory.storage) == ["1"]
+    assert list(durable.storage) == ["1", "2"]
+    assert memory.get(config("3")) is None
+    assert (memory.hits, memory.misses, memory.evictions) == (0, 2, 2)
+
+
+def test_memory_saver_history() -> None:
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+    messages = [f"hello {i}" for i in range(1_000)]
+
+    def checkpoint(step: int) -> Checkpoint:
+        checkpoint = empty_checkpoint()
+        checkpoint["ts"] = f"2024-01-01T00:00:0{step}"
+        checkpoint["channel_values"] = {"messages": messages, "step": step}
+        return checkpoint
+
+    def at(thread_ts: str) -> RunnableConfig:
+        return {"configurable": {"thread_id": "1", "thread_ts": thread_ts}}
+
+    memory = MemorySaver(max_history=3, snapshot_interval=2)
+    memory.put(config, checkpoint(1))
+    memory.put_delta(config, checkpoint(2), lambda: checkpoint(2))
+    memory.put(config, checkpoint(3))
+    memory.put(config, checkpoint(4))
+    history = list(memory.history(config))
+    assert [c["channel_values"]["step"] for c in history] == [4, 3, 2]
+    # values unchanged between checkpoints are shared, not copied
+    assert all(c["channel_values"]["messages"] is messages for c in history)
+    assert memory.get(config) == checkpoint(4)
+    assert memory.get(at(history[2]["ts"])) == checkpoint(2)
+    assert memory.get(at("2024-01-01T00:00:01")) is None
+
+    # sizes of earlier checkpoints count towards max_bytes, and are spilled too
+    durable = MemorySaver(max_history=3)
+    memory = MemorySaver(max_history=3, max_bytes=40_000, spill=durable)
+    for step in range(1, 5):
+        memory.put(config, checkpoint(step))
+    memory.put({"configurable": {"thread_id": "2"}}, checkpoint(1))
+    assert list(memory.storage) == ["2"]
+    assert memory._bytes == memory._sizes["2"]
+    assert [c["channel_values"]["step"] for c in durable.history(config)] == [4, 3, 2]
+    assert [c["channel_values"]["step"] for c in memory.history(config)] == [4, 3, 2]
+
+
+async def test_saver_io_threads() -> None:
+    release = threading.Event()
+
+    class SlowSaver(BaseCheckpointSaver):
+        checkpoint: Optional[Checkpoint] = None
+
+        def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+            release.wait()
+            assert threading.current_thread().name.startswith("checkpoint-io")
+            return self.checkpoint
+
+        def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+            self.checkpoint = checkpoint
+
+    saver = SlowSaver(max_io_workers=2)
+    await saver.aput({"configurable": {"thread_id": "1"}}, empty_checkpoint())
+    # calls beyond max_io_workers wait for a thread, and are counted
+    gets = [
+        asyncio.create_task(saver.aget({"configurable": {"thread_id": "1"}}))
+        for _ in range(5)
+    ]
+    while saver.io_stats.running < 2:
+        await asyncio.sleep(0.01)
+    assert saver.io_stats == IOStats(queued=3, running=2, completed=0, max_queued=5)
+    release.set()
+    assert all(c is not None for c in await asyncio.gather(*gets))
+    assert saver.io_stats == IOStats(queued=0, running=0, completed=5, max_queued=5)
+    saver.close()
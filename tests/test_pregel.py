@@ -1,11 +1,13 @@
 import operator
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Generator
+from pathlib import Path
+from typing import Any, Generator
 
 import pytest
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnablePassthrough
 from pytest_mock import MockerFixture
 
 from langgraph.channels.base import InvalidUpdateError
@@ -13,10 +15,14 @@ from langgraph.channels.binop import BinaryOperatorAggregate
 from langgraph.channels.context import Context
 from langgraph.channels.last_value import LastValue
 from langgraph.channels.topic import Topic
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointAt
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import END, Graph
 from langgraph.pregel import Channel, Pregel
+from langgraph.pregel.executor import PregelExecutor
 from langgraph.pregel.reserved import ReservedChannels
+from langgraph.pregel.retry import RetryPolicy
 
 
 def test_invoke_single_process_in_out(mocker: MockerFixture) -> None:
@@ -277,6 +283,40 @@ def test_batch_two_processes_in_out() -> None:
     assert gapp.batch([3, 2, 1, 3, 5]) == [5, 4, 3, 5, 7]
 
 
+def test_batch_dispatches_node_batches() -> None:
+    batch_sizes: list[int] = []
+
+    class AddOne(RunnableLambda):
+        def batch(self, inputs: Any, config: Any = None, **kwargs: Any) -> Any:
+            batch_sizes.append(len(inputs))
+            return super().batch(inputs, config, **kwargs)
+
+    def add_one(inp: int) -> int:
+        if inp == 10:
+            raise ValueError("Input is too large")
+        return inp + 1
+
+    one = Channel.subscribe_to("input") | AddOne(add_one) | Channel.write_to("one")
+    two = Channel.subscribe_to("one") | AddOne(add_one) | Channel.write_to("output")
+
+    app = Pregel(nodes={"one": one, "two": two})
+
+    # each node runs once per step, with the inputs of all invocations
+    assert app.batch([3, 2, 1]) == [5, 4, 3]
+    assert batch_sizes == [3, 3]
+
+    # failed inputs stop early, the others carry on
+    batch_sizes.clear()
+    results = app.batch([3, 10, 9], return_exceptions=True)
+    assert results[0] == 5
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], ValueError)
+    assert batch_sizes == [3, 2]
+
+    with pytest.raises(ValueError):
+        app.batch([3, 10, 9])
+
+
 def test_invoke_many_processes_in_out(mocker: MockerFixture) -> None:
     test_size = 100
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
@@ -409,6 +449,254 @@ def test_invoke_checkpoint(mocker: MockerFixture) -> None:
     assert checkpoint["channel_values"].get("total") == 5
 
 
+def test_invoke_checkpoint_deltas() -> None:
+    memory = MemorySaver(at=CheckpointAt.END_OF_STEP, snapshot_interval=3)
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+    app = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a"),
+            "two": Channel.subscribe_to("a")
+            | (lambda x: x + 1)
+            | Channel.write_to("b"),
+            "three": Channel.subscribe_to("b")
+            | (lambda x: x + 1)
+            | Channel.write_to("output"),
+        },
+        saver=memory,
+    )
+
+    assert app.invoke(1, config) == 4
+    # the first save is a full snapshot, the next two only have updated channels
+    assert memory.storage["1"]["channel_values"] == {
+        "input": 1,
+        "a": 2,
+        ReservedChannels.is_last_step: False,
+    }
+    assert [d["channel_values"] for d in memory.deltas["1"]] == [
+        {"b": 3, ReservedChannels.is_last_step: False},
+        {"output": 4, ReservedChannels.is_last_step: False},
+    ]
+    # get() applies the deltas to the snapshot
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"] == {
+        "input": 1,
+        "a": 2,
+        "b": 3,
+        "output": 4,
+        ReservedChannels.is_last_step: False,
+    }
+    assert checkpoint["channel_versions"] == memory.deltas["1"][-1]["channel_versions"]
+
+    # the next save is a full snapshot again
+    assert app.invoke(10, config) == 13
+    assert memory.storage["1"]["channel_values"] == {
+        "input": 10,
+        "a": 11,
+        "b": 3,
+        "output": 4,
+        ReservedChannels.is_last_step: False,
+    }
+    assert len(memory.deltas["1"]) == 2
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"]["output"] == 13
+
+
+def test_invoke_checkpoint_sqlite(tmp_path: Path) -> None:
+    add_one = Channel.subscribe_to("input") | (lambda x: x + 1)
+    app = Pregel(
+        nodes={
+            "one": add_one | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=SqliteSaver(path=str(tmp_path / "checkpoints.db")),
+    )
+    assert app.invoke(1, {"configurable": {"thread_id": "1"}}) == 2
+    assert app.invoke(5, {"configurable": {"thread_id": "2"}}) == 6
+
+    # checkpoints outlive the saver, and threads are kept apart
+    with SqliteSaver(path=str(tmp_path / "checkpoints.db")) as saver:
+        app = app.copy(update={"saver": saver})
+        assert app.invoke(10, {"configurable": {"thread_id": "1"}}) == 11
+        checkpoint = saver.get({"configurable": {"thread_id": "1"}})
+        assert checkpoint is not None
+        assert checkpoint["channel_values"]["log"][1] == [2, 11]
+        checkpoint = saver.get({"configurable": {"thread_id": "2"}})
+        assert checkpoint is not None
+        assert checkpoint["channel_values"]["log"][1] == [6]
+        assert saver.get({"configurable": {"thread_id": "3"}}) is None
+
+        # checkpoints put by concurrent invocations are committed together
+        with ThreadPoolExecutor(8) as pool:
+            assert list(
+                pool.map(
+                    lambda i: app.invoke(i, {"configurable": {"thread_id": f"t{i}"}}),
+                    range(20),
+                )
+            ) == [i + 1 for i in range(20)]
+        for i in range(20):
+            checkpoint = saver.get({"configurable": {"thread_id": f"t{i}"}})
+            assert checkpoint is not None
+            assert checkpoint["channel_values"]["output"] == i + 1
+
+
+@pytest.mark.parametrize("snapshot_interval", [1, 3])
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_invoke_checkpoint_history(
+    tmp_path: Path, kind: str, snapshot_interval: int
+) -> None:
+    saver: BaseCheckpointSaver
+    if kind == "memory":
+        saver = MemorySaver(max_history=2, snapshot_interval=snapshot_interval)
+    else:
+        saver = SqliteSaver(path=str(tmp_path / "checkpoints.db"), max_history=2)
+    add_one = Channel.subscribe_to("input") | (lambda x: x + 1)
+    app = Pregel(
+        nodes={
+            "one": add_one | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=saver,
+    )
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+    def logs(config: RunnableConfig) -> list[list[int]]:
+        return [c["channel_values"]["log"][1] for c in saver.history(config)]
+
+    for input in (1, 5, 10):
+        app.invoke(input, config)
+    # only the latest two are kept, newest first
+    assert logs(config) == [[2, 6, 11], [2, 6]]
+    _, earlier = saver.history(config)
+    assert saver.get(config) == next(saver.history(config))
+
+    # get an earlier checkpoint, and fork the thread from it
+    forked: RunnableConfig = {
+        "configurable": {"thread_id": "1", "thread_ts": earlier["ts"]}
+    }
+    assert saver.get(forked) == earlier
+    assert app.invoke(20, forked) == 21
+    assert logs(config) == [[2, 6, 21], [2, 6, 11]]
+    assert app.invoke(30, config) == 31
+    assert logs(config) == [[2, 6, 21, 31], [2, 6, 21]]
+    assert saver.get(forked) is None
+    assert logs({"configurable": {"thread_id": "2"}}) == []
+
+
+def test_invoke_checkpoint_not_aliased() -> None:
+    memory = MemorySaver(at=CheckpointAt.END_OF_STEP)
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+    def fail_on_ten(x: int) -> int:
+        if x == 10:
+            raise ValueError("ten")
+        return x
+
+    app = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a", "log"),
+            "two": Channel.subscribe_to("a")
+            | fail_on_ten
+            | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=memory,
+    )
+
+    assert app.invoke(1, config) == 2
+    saved = memory.get(config)
+    assert saved is not None
+    saved_versions = dict(saved["channel_versions"])
+
+    # a run failing after its first step leaves the checkpoint of that step
+    # as it was saved, unchanged by the steps after it
+    with pytest.raises(ValueError, match="ten"):
+        app.invoke(9, config)
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint is not saved
+    assert checkpoint["channel_values"]["log"][1] == [2, 2, 10]
+    assert checkpoint["channel_versions"]["a"] == saved_versions["a"] + 1
+    # so "two" is still pending, as it hadn't finished with the latest "a"
+    assert checkpoint["versions_seen"]["two"]["a"] == saved_versions["a"]
+    assert saved["channel_values"]["log"][1] == [2, 2]
+    assert dict(saved["channel_versions"]) == saved_versions
+
+
+def test_invoke_checkpoint_write_behind() -> None:
+    saved: list[list[int]] = []
+
+    class SlowSaver(MemorySaver):
+        def put(self, config: Any, checkpoint: Any) -> None:
+            time.sleep(0.05)
+            saved.append(checkpoint["channel_values"]["log"][1])
+            if len(saved) == 3:
+                raise ValueError("disk full")
+            super().put(config, checkpoint)
+
+    memory = SlowSaver(at=CheckpointAt.END_OF_STEP)
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+    app = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a", "log"),
+            "two": Channel.subscribe_to("a")
+            | (lambda x: x + 1)
+            | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=memory,
+        write_behind=1,
+    )
+
+    # the run waits for its checkpoints to be saved before returning
+    assert app.invoke(1, config) == 3
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"]["output"] == 3
+    # each checkpoint has the values as of its step, despite the channel
+    # being updated in the next step while it was being saved
+    assert saved == [[2], [2, 3]]
+
+    # a failed save is raised at the next step boundary
+    with pytest.raises(ValueError, match="disk full"):
+        app.invoke(10, config)
+    assert saved == [[2], [2, 3], [2, 3, 11]]
+    # and nothing else is saved afterwards
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"]["output"] == 3
+
+
+def test_invoke_checkpoint_resume_pending(mocker: MockerFixture) -> None:
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+
+    one = Channel.subscribe_to("input") | add_one | Channel.write_to("between")
+    two = Channel.subscribe_to("between") | add_one | Channel.write_to("output")
+
+    memory = MemorySaver()
+
+    app = Pregel(nodes={"one": one, "two": two}, saver=memory)
+
+    # recursion limit stops the run before "two" gets to run
+    assert (
+        app.invoke(2, {"recursion_limit": 1, "configurable": {"thread_id": "1"}})
+        is None
+    )
+    assert add_one.call_count == 1
+    # next run picks up "two", which was left pending in the checkpoint
+    assert app.invoke(None, {"configurable": {"thread_id": "1"}}) == 4
+    assert add_one.call_count == 2
+
+
 def test_invoke_two_processes_two_in_join_two_out(mocker: MockerFixture) -> None:
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
     add_10_each = mocker.Mock(side_effect=lambda x: sorted(y + 10 for y in x))
@@ -477,6 +765,257 @@ def test_invoke_join_then_call_other_app(mocker: MockerFixture) -> None:
         assert [*executor.map(app.invoke, [[2, 3]] * 10)] == [27] * 10
 
 
+def test_invoke_shared_executor(mocker: MockerFixture) -> None:
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+
+    with PregelExecutor(max_concurrency=1) as executor:
+        inner_app = Pregel(
+            nodes={
+                "one": Channel.subscribe_to("input")
+                | add_one
+                | Channel.write_to("output")
+            },
+            executor=executor,
+        )
+        one = Channel.subscribe_to("input") | inner_app | Channel.write_to("between")
+        two = Channel.subscribe_to("between") | add_one | Channel.write_to("output")
+
+        app = Pregel(nodes={"one": one, "two": two}, executor=executor)
+
+        # inner app is invoked from a worker of the shared pool, without deadlock
+        for _ in range(3):
+            assert app.invoke(2) == 4
+        assert app.batch([2, 3]) == [4, 5]
+
+    with pytest.raises(RuntimeError):
+        app.invoke(2)
+
+
+def _double(x: int) -> int:
+    return x * 2
+
+
+def _add_values(x: dict[str, int]) -> int:
+    return sum(x.values())
+
+
+def test_invoke_run_in_process() -> None:
+    one = (
+        Channel.subscribe_to("input", run_in_process=True)
+        | _double
+        | Channel.write_to("between")
+    )
+    two = (
+        Channel.subscribe_to(["between"], run_in_process=True).join(["input"])
+        | _add_values
+        | Channel.write_to("output")
+    )
+
+    with pytest.raises(ValueError):
+        Pregel(nodes={"one": one, "two": two})
+
+    with ProcessPoolExecutor(max_workers=2) as process_executor:
+        app = Pregel(nodes={"one": one, "two": two}, process_executor=process_executor)
+
+        assert app.invoke(2) == 6
+        assert app.batch([2, 3]) == [6, 9]
+
+
+def test_invoke_relaxed_barrier() -> None:
+    fast_done = threading.Event()
+
+    def slow(x: int) -> bool:
+        # in strict mode "fast_two" can only start once this task finishes
+        return fast_done.wait(timeout=0.5)
+
+    def fast_two(x: int) -> int:
+        fast_done.set()
+        return x + 1
+
+    nodes = {
+        "slow": Channel.subscribe_to("input") | slow | Channel.write_to("slow_out"),
+        "fast_one": Channel.subscribe_to("input")
+        | (lambda x: x + 1)
+        | Channel.write_to("a"),
+        "fast_two": Channel.subscribe_to("a") | fast_two | Channel.write_to("b"),
+        "join": Channel.subscribe_to(["slow_out", "b"])
+        | (lambda x: (x["slow_out"], x["b"]))
+        | Channel.write_to("output"),
+    }
+
+    app = Pregel(nodes=nodes, relaxed_barrier=True)
+    assert app._plan.contended == frozenset()
+
+    # "fast_two" runs while "slow" is still running
+    assert app.invoke(2) == (True, 4)
+    # output is streamed as each task finishes
+    fast_done.clear()
+    assert [*app.stream(2, output=["a", "b"])] == [{"a": 3}, {"b": 4}]
+
+    # with a LastValue channel written by two nodes, falls back to strict mode
+    fast_done.clear()
+    contended = Pregel(
+        nodes={
+            **nodes,
+            "fast_one": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a", slow_out=lambda _: False),
+        },
+        relaxed_barrier=True,
+    )
+    assert contended._plan.contended == frozenset(["slow_out"])
+    with pytest.raises(InvalidUpdateError):
+        contended.invoke(2)
+
+
+def test_invoke_retry_policy(mocker: MockerFixture) -> None:
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+    flaky = mocker.Mock(side_effect=[ConnectionError(), ConnectionError(), 10])
+    policy = RetryPolicy(initial_interval=0.01, jitter=False, retry_on=ConnectionError)
+
+    one = Channel.subscribe_to("input") | add_one | Channel.write_to("a")
+    two = (
+        Channel.subscribe_to("input", retry_policy=policy)
+        # the write to "partial" of failed attempts is discarded
+        | Channel.write_to(partial=lambda _: 1)
+        | flaky
+        | Channel.write_to("b")
+    )
+    three = (
+        Channel.subscribe_to(["a", "b"])
+        | (lambda x: x["a"] + x["b"])
+        | Channel.write_to("output")
+    )
+
+    app = Pregel(
+        nodes={"one": one, "two": two, "three": three},
+        channels={"partial": BinaryOperatorAggregate(int, operator.add)},
+    )
+
+    assert [*app.stream(2, output=["partial", "output"])] == [
+        {"partial": 1},
+        {"output": 13},
+    ]
+    # only the failed task was retried
+    assert add_one.call_count == 1
+    assert flaky.call_count == 3
+
+    # gives up after max_attempts
+    flaky.side_effect = ConnectionError()
+    with pytest.raises(ConnectionError):
+        app.invoke(2)
+    assert flaky.call_count == 6
+
+    # other exceptions aren't retried
+    flaky.side_effect = ValueError()
+    with pytest.raises(ValueError):
+        app.invoke(2)
+    assert flaky.call_count == 7
+
+    # in batches only the failed inputs are retried
+    failed: list[int] = []
+
+    def fail_once_for_two(x: int) -> int:
+        if x == 2 and not failed:
+            failed.append(x)
+            raise ConnectionError()
+        return x * 10
+
+    flaky.side_effect = fail_once_for_two
+    assert app.batch([2, 3]) == [23, 34]
+    assert flaky.call_count == 10
+
+
+def test_invoke_node_timeout_and_run_budget(mocker: MockerFixture) -> None:
+    def sleep_then_add_one(x: int) -> int:
+        time.sleep(0.2)
+        return x + 1
+
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+
+    fast = Channel.subscribe_to("input") | add_one | Channel.write_to("output")
+    slow = (
+        Channel.subscribe_to("input", timeout=0.05)
+        | sleep_then_add_one
+        | Channel.write_to("other")
+    )
+
+    # the slow node's timeout doesn't depend on the other tasks of the step
+    app = Pregel(nodes={"fast": fast, "slow": slow})
+    with pytest.raises(TimeoutError):
+        app.invoke(2)
+
+    # a generous timeout is fine
+    app = Pregel(
+        nodes={
+            "fast": fast,
+            "slow": Channel.subscribe_to("input", timeout=5)
+            | sleep_then_add_one
+            | Channel.write_to("other"),
+        },
+        channels={"other": LastValue(int)},
+    )
+    assert app.invoke(2, output=["output", "other"]) == {"output": 3, "other": 3}
+
+    # the run budget is enforced across steps, and no step is started after it
+    chain = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | sleep_then_add_one
+            | Channel.write_to("a"),
+            "two": Channel.subscribe_to("a")
+            | sleep_then_add_one
+            | Channel.write_to("b"),
+            "three": Channel.subscribe_to("b") | add_one | Channel.write_to("output"),
+        },
+        run_timeout=0.3,
+    )
+    add_one.reset_mock()
+    with pytest.raises(TimeoutError):
+        chain.invoke(2)
+    assert add_one.call_count == 0
+    assert chain.copy(update={"run_timeout": 5}).invoke(2) == 5
+
+
+def test_stream_tasks_mode() -> None:
+    first_chunk_received = threading.Event()
+
+    def slow(x: int) -> int:
+        # only finishes once the output of "fast" has been streamed
+        assert first_chunk_received.wait(timeout=1)
+        return x * 10
+
+    app = Pregel(
+        nodes={
+            "fast": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a", "hidden"),
+            "slow": Channel.subscribe_to("input") | slow | Channel.write_to("b"),
+            "join": Channel.subscribe_to(["a", "b"])
+            | (lambda x: x["a"] + x["b"])
+            | Channel.write_to("output"),
+        },
+        channels={"hidden": LastValue(int)},
+        hidden=["hidden"],
+    )
+
+    chunks = []
+    for chunk in app.stream(2, stream_mode="tasks"):
+        chunks.append(chunk)
+        first_chunk_received.set()
+
+    assert chunks == [
+        {"node": "fast", "step": 0, "writes": [("a", 3)]},
+        {"node": "slow", "step": 0, "writes": [("b", 20)]},
+        {"node": "join", "step": 1, "writes": [("output", 23)]},
+    ]
+    assert [*app.stream(2, output="output", stream_mode="tasks")] == [
+        {"node": "join", "step": 1, "writes": [("output", 23)]}
+    ]
+    # channels are still updated at the end of each step
+    assert app.invoke(2) == 23
+
+
 def test_invoke_two_processes_one_in_two_out(mocker: MockerFixture) -> None:
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
 
@@ -1,10 +1,12 @@
 import asyncio
 import operator
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
 from typing import Any, AsyncGenerator, AsyncIterator, Generator
 
 import pytest
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnablePassthrough
 from pytest_mock import MockerFixture
 
 from langgraph.channels.base import InvalidUpdateError
@@ -12,10 +14,13 @@ from langgraph.channels.binop import BinaryOperatorAggregate
 from langgraph.channels.context import Context
 from langgraph.channels.last_value import LastValue
 from langgraph.channels.topic import Topic
+from langgraph.checkpoint.base import CheckpointAt
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import END, Graph
 from langgraph.pregel import Channel, Pregel
 from langgraph.pregel.reserved import ReservedChannels
+from langgraph.pregel.retry import RetryPolicy
 
 
 async def test_invoke_single_process_in_out(mocker: MockerFixture) -> None:
@@ -288,6 +293,40 @@ async def test_batch_two_processes_in_out() -> None:
     assert await gapp.abatch([3, 2, 1, 3, 5]) == [5, 4, 3, 5, 7]
 
 
+async def test_batch_dispatches_node_batches() -> None:
+    batch_sizes: list[int] = []
+
+    class AddOne(RunnableLambda):
+        async def abatch(self, inputs: Any, config: Any = None, **kwargs: Any) -> Any:
+            batch_sizes.append(len(inputs))
+            return await super().abatch(inputs, config, **kwargs)
+
+    def add_one(inp: int) -> int:
+        if inp == 10:
+            raise ValueError("Input is too large")
+        return inp + 1
+
+    one = Channel.subscribe_to("input") | AddOne(add_one) | Channel.write_to("one")
+    two = Channel.subscribe_to("one") | AddOne(add_one) | Channel.write_to("output")
+
+    app = Pregel(nodes={"one": one, "two": two})
+
+    # each node runs once per step, with the inputs of all invocations
+    assert await app.abatch([3, 2, 1]) == [5, 4, 3]
+    assert batch_sizes == [3, 3]
+
+    # failed inputs stop early, the others carry on
+    batch_sizes.clear()
+    results = await app.abatch([3, 10, 9], return_exceptions=True)
+    assert results[0] == 5
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], ValueError)
+    assert batch_sizes == [3, 2]
+
+    with pytest.raises(ValueError):
+        await app.abatch([3, 10, 9])
+
+
 async def test_invoke_many_processes_in_out(mocker: MockerFixture) -> None:
     test_size = 100
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
@@ -424,6 +463,27 @@ async def test_invoke_checkpoint(mocker: MockerFixture) -> None:
     assert checkpoint["channel_values"].get("total") == 5
 
 
+async def test_invoke_checkpoint_resume_pending(mocker: MockerFixture) -> None:
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+
+    one = Channel.subscribe_to("input") | add_one | Channel.write_to("between")
+    two = Channel.subscribe_to("between") | add_one | Channel.write_to("output")
+
+    memory = MemorySaver()
+
+    app = Pregel(nodes={"one": one, "two": two}, saver=memory)
+
+    # recursion limit stops the run before "two" gets to run
+    assert (
+        await app.ainvoke(2, {"recursion_limit": 1, "configurable": {"thread_id": "1"}})
+        is None
+    )
+    assert add_one.call_count == 1
+    # next run picks up "two", which was left pending in the checkpoint
+    assert await app.ainvoke(None, {"configurable": {"thread_id": "1"}}) == 4
+    assert add_one.call_count == 2
+
+
 async def test_invoke_two_processes_two_in_join_two_out(mocker: MockerFixture) -> None:
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
     add_10_each = mocker.Mock(side_effect=lambda x: sorted(y + 10 for y in x))
@@ -498,6 +558,271 @@ async def test_invoke_join_then_call_other_pubsub(mocker: MockerFixture) -> None
     ]
 
 
+def _double(x: int) -> int:
+    return x * 2
+
+
+def _add_values(x: dict[str, int]) -> int:
+    return sum(x.values())
+
+
+async def test_invoke_run_in_process() -> None:
+    one = (
+        Channel.subscribe_to("input", run_in_process=True)
+        | _double
+        | Channel.write_to("between")
+    )
+    two = (
+        Channel.subscribe_to(["between"], run_in_process=True).join(["input"])
+        | _add_values
+        | Channel.write_to("output")
+    )
+
+    with ProcessPoolExecutor(max_workers=2) as process_executor:
+        app = Pregel(nodes={"one": one, "two": two}, process_executor=process_executor)
+
+        assert await app.ainvoke(2) == 6
+        assert await app.abatch([2, 3]) == [6, 9]
+        assert await asyncio.gather(app.ainvoke(2), app.ainvoke(3)) == [6, 9]
+
+
+async def test_invoke_relaxed_barrier() -> None:
+    fast_done = asyncio.Event()
+
+    async def slow(x: int) -> bool:
+        # in strict mode "fast_two" can only start once this task finishes
+        try:
+            await asyncio.wait_for(fast_done.wait(), timeout=0.5)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def fast_two(x: int) -> int:
+        fast_done.set()
+        return x + 1
+
+    nodes = {
+        "slow": Channel.subscribe_to("input") | slow | Channel.write_to("slow_out"),
+        "fast_one": Channel.subscribe_to("input")
+        | (lambda x: x + 1)
+        | Channel.write_to("a"),
+        "fast_two": Channel.subscribe_to("a") | fast_two | Channel.write_to("b"),
+        "join": Channel.subscribe_to(["slow_out", "b"])
+        | (lambda x: (x["slow_out"], x["b"]))
+        | Channel.write_to("output"),
+    }
+
+    app = Pregel(nodes=nodes, relaxed_barrier=True)
+
+    # "fast_two" runs while "slow" is still running
+    assert await app.ainvoke(2) == (True, 4)
+    # output is streamed as each task finishes
+    fast_done.clear()
+    assert [c async for c in app.astream(2, output=["a", "b"])] == [
+        {"a": 3},
+        {"b": 4},
+    ]
+
+    # without relaxed barrier, "slow" times out waiting for "fast_two"
+    fast_done.clear()
+    assert await app.copy(update={"relaxed_barrier": False}).ainvoke(2) == (False, 4)
+
+
+async def test_invoke_retry_policy(mocker: MockerFixture) -> None:
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+    flaky = mocker.Mock(side_effect=[ConnectionError(), ConnectionError(), 10])
+    policy = RetryPolicy(initial_interval=0.01, jitter=False, retry_on=ConnectionError)
+
+    one = Channel.subscribe_to("input") | add_one | Channel.write_to("a")
+    two = (
+        Channel.subscribe_to("input", retry_policy=policy)
+        # the write to "partial" of failed attempts is discarded
+        | Channel.write_to(partial=lambda _: 1)
+        | flaky
+        | Channel.write_to("b")
+    )
+    three = (
+        Channel.subscribe_to(["a", "b"])
+        | (lambda x: x["a"] + x["b"])
+        | Channel.write_to("output")
+    )
+
+    app = Pregel(
+        nodes={"one": one, "two": two, "three": three},
+        channels={"partial": BinaryOperatorAggregate(int, operator.add)},
+    )
+
+    assert [c async for c in app.astream(2, output=["partial", "output"])] == [
+        {"partial": 1},
+        {"output": 13},
+    ]
+    # only the failed task was retried
+    assert add_one.call_count == 1
+    assert flaky.call_count == 3
+
+    # gives up after max_attempts
+    flaky.side_effect = ConnectionError()
+    with pytest.raises(ConnectionError):
+        await app.ainvoke(2)
+    assert flaky.call_count == 6
+
+    # in batches only the failed inputs are retried
+    failed: list[int] = []
+
+    def fail_once_for_two(x: int) -> int:
+        if x == 2 and not failed:
+            failed.append(x)
+            raise ConnectionError()
+        return x * 10
+
+    flaky.side_effect = fail_once_for_two
+    assert await app.abatch([2, 3]) == [23, 34]
+    assert flaky.call_count == 9
+
+
+async def test_invoke_node_timeout_and_run_budget(mocker: MockerFixture) -> None:
+    async def sleep_then_add_one(x: int) -> int:
+        await asyncio.sleep(0.2)
+        return x + 1
+
+    add_one = mocker.Mock(side_effect=lambda x: x + 1)
+
+    fast = Channel.subscribe_to("input") | add_one | Channel.write_to("output")
+    slow = (
+        Channel.subscribe_to("input", timeout=0.05)
+        | sleep_then_add_one
+        | Channel.write_to("other")
+    )
+
+    # the slow node's timeout doesn't depend on the other tasks of the step
+    app = Pregel(nodes={"fast": fast, "slow": slow})
+    with pytest.raises(TimeoutError):
+        await app.ainvoke(2)
+
+    # the run budget is enforced across steps, and no step is started after it
+    chain = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | sleep_then_add_one
+            | Channel.write_to("a"),
+            "two": Channel.subscribe_to("a")
+            | sleep_then_add_one
+            | Channel.write_to("b"),
+            "three": Channel.subscribe_to("b") | add_one | Channel.write_to("output"),
+        },
+        run_timeout=0.3,
+    )
+    add_one.reset_mock()
+    with pytest.raises(TimeoutError):
+        await chain.ainvoke(2)
+    assert add_one.call_count == 0
+    assert await chain.copy(update={"run_timeout": 5}).ainvoke(2) == 5
+
+
+async def test_stream_tasks_mode() -> None:
+    first_chunk_received = asyncio.Event()
+
+    async def slow(x: int) -> int:
+        # only finishes once the output of "fast" has been streamed
+        await asyncio.wait_for(first_chunk_received.wait(), timeout=1)
+        return x * 10
+
+    app = Pregel(
+        nodes={
+            "fast": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a"),
+            "slow": Channel.subscribe_to("input") | slow | Channel.write_to("b"),
+            "join": Channel.subscribe_to(["a", "b"])
+            | (lambda x: x["a"] + x["b"])
+            | Channel.write_to("output"),
+        },
+    )
+
+    chunks = []
+    async for chunk in app.astream(2, stream_mode="tasks"):
+        chunks.append(chunk)
+        first_chunk_received.set()
+
+    assert chunks == [
+        {"node": "fast", "step": 0, "writes": [("a", 3)]},
+        {"node": "slow", "step": 0, "writes": [("b", 20)]},
+        {"node": "join", "step": 1, "writes": [("output", 23)]},
+    ]
+
+
+async def test_invoke_checkpoint_sqlite(tmp_path: Path) -> None:
+    add_one = Channel.subscribe_to("input") | (lambda x: x + 1)
+    app = Pregel(
+        nodes={
+            "one": add_one | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=SqliteSaver(path=str(tmp_path / "checkpoints.db")),
+    )
+    assert await app.ainvoke(1, {"configurable": {"thread_id": "1"}}) == 2
+    assert await app.ainvoke(5, {"configurable": {"thread_id": "2"}}) == 6
+
+    # checkpoints outlive the saver, and threads are kept apart
+    with SqliteSaver(path=str(tmp_path / "checkpoints.db")) as saver:
+        app = app.copy(update={"saver": saver})
+        assert await app.ainvoke(10, {"configurable": {"thread_id": "1"}}) == 11
+        checkpoint = await saver.aget({"configurable": {"thread_id": "1"}})
+        assert checkpoint is not None
+        assert checkpoint["channel_values"]["log"][1] == [2, 11]
+        checkpoint = await saver.aget({"configurable": {"thread_id": "2"}})
+        assert checkpoint is not None
+        assert checkpoint["channel_values"]["log"][1] == [6]
+        assert await saver.aget({"configurable": {"thread_id": "3"}}) is None
+
+
+async def test_invoke_checkpoint_write_behind() -> None:
+    saved: list[list[int]] = []
+
+    class SlowSaver(MemorySaver):
+        async def aput(self, config: Any, checkpoint: Any) -> None:
+            await asyncio.sleep(0.05)
+            saved.append(checkpoint["channel_values"]["log"][1])
+            if len(saved) == 3:
+                raise ValueError("disk full")
+            self.put(config, checkpoint)
+
+    memory = SlowSaver(at=CheckpointAt.END_OF_STEP)
+    config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+
+    app = Pregel(
+        nodes={
+            "one": Channel.subscribe_to("input")
+            | (lambda x: x + 1)
+            | Channel.write_to("a", "log"),
+            "two": Channel.subscribe_to("a")
+            | (lambda x: x + 1)
+            | Channel.write_to("output", "log"),
+        },
+        channels={"log": Topic(int, accumulate=True)},
+        saver=memory,
+        write_behind=1,
+    )
+
+    # the run waits for its checkpoints to be saved before returning
+    assert await app.ainvoke(1, config) == 3
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"]["output"] == 3
+    # each checkpoint has the values as of its step, despite the channel
+    # being updated in the next step while it was being saved
+    assert saved == [[2], [2, 3]]
+
+    # a failed save is raised at the next step boundary
+    with pytest.raises(ValueError, match="disk full"):
+        await app.ainvoke(10, config)
+    assert saved == [[2], [2, 3], [2, 3, 11]]
+    # and nothing else is saved afterwards
+    checkpoint = memory.get(config)
+    assert checkpoint is not None
+    assert checkpoint["channel_values"]["output"] == 3
+
+
 async def test_invoke_two_processes_one_in_two_out(mocker: MockerFixture) -> None:
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
 